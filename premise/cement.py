@@ -231,6 +231,18 @@ class Cement(BaseTransformation):
             production_variable="cement, dry feed rotary kiln",
         )
 
+        # the efficiency changes of all regions are looked up at once
+        efficiency_changes = dict(
+            zip(
+                d_act_clinker,
+                self.find_iam_efficiency_changes(
+                    data=self.iam_data.cement_efficiencies,
+                    variable="cement, dry feed rotary kiln",
+                    locations=[ds["location"] for ds in d_act_clinker.values()],
+                ).tolist(),
+            )
+        )
+
         for region, dataset in d_act_clinker.items():
             # calculate current thermal energy consumption per kg clinker
             energy_details = self.fetch_current_energy_details(dataset)
@@ -310,11 +322,7 @@ class Cement(BaseTransformation):
             # equal to the ratio fuel/output in the year in question
             # divided by the ratio fuel/output in 2020
 
-            scaling_factor = 1 / self.find_iam_efficiency_change(
-                data=self.iam_data.cement_efficiencies,
-                variable="cement, dry feed rotary kiln",
-                location=dataset["location"],
-            )
+            scaling_factor = 1 / efficiency_changes[region]
 
             new_energy_input_per_ton_clinker = 0
 
@@ -24,6 +24,7 @@ from .transformation import (
     InventorySet,
     List,
     Tuple,
+    get_ecoinvent_to_iam_location,
     get_suppliers_of_a_region,
     np,
     uuid,
@@ -1251,33 +1252,28 @@ class Electricity(BaseTransformation):
             e for e in dataset["exchanges"] if e["type"] == "production"
         ]
 
-        # Calculate share of production volume for each region
-        for r in regions:
-            if r == "World":
-                continue
-
-            share = (
-                (
-                    self.iam_data.production_volumes.sel(
-                        region=r,
-                        variables=self.iam_data.electricity_markets.variables.values,
-                    ).sum(dim="variables")
-                    / self.iam_data.production_volumes.sel(
-                        region=[
-                            x
-                            for x in self.iam_data.production_volumes.region.values
-                            if x != "World"
-                        ],
-                        variables=self.iam_data.electricity_markets.variables.values,
-                    ).sum(dim=["variables", "region"])
-                )
-                .interp(
-                    year=self.year,
-                    kwargs={"fill_value": "extrapolate"},
-                )
-                .values
+        # Calculate share of production volume for each region,
+        # with a single reduction over all regions
+        regions = [r for r in regions if r != "World"]
+        volumes = self.iam_data.production_volumes.sel(
+            variables=self.iam_data.electricity_markets.variables.values,
+        ).sum(dim="variables")
+        shares = (
+            (
+                volumes.sel(region=regions)
+                / volumes.sel(
+                    region=[x for x in volumes.region.values if x != "World"]
+                ).sum(dim="region")
+            )
+            .interp(
+                year=self.year,
+                kwargs={"fill_value": "extrapolate"},
             )
+            .transpose("region", ...)
+            .values.reshape(len(regions))
+        )
 
+        for r, share in zip(regions, shares):
             if np.isnan(share):
                 print("Incorrect market share for", dataset["name"], "in", r)
 
@@ -1635,10 +1631,27 @@ class Electricity(BaseTransformation):
             technologies=list(set(eff_labels).intersection(all_techs)),
         )
 
+        eff_regions = self.iam_data.electricity_efficiencies.coords[
+            "region"
+        ].values.tolist()
+
         for technology in technologies_map:
             dict_technology = technologies_map[technology]
             # print("Rescale inventories and emissions for", technology)
 
+            # the efficiency changes of all IAM regions
+            # are looked up at once, for all the datasets
+            efficiency_changes = dict(
+                zip(
+                    eff_regions,
+                    self.find_iam_efficiency_changes(
+                        data=self.iam_data.electricity_efficiencies,
+                        variable=technology,
+                        locations=eff_regions,
+                    ).tolist(),
+                )
+            )
+
             for dataset in ws.get_many(
                 self.database,
                 ws.equals("unit", "kilowatt hour"),
@@ -1659,21 +1672,12 @@ class Electricity(BaseTransformation):
                 new_efficiency = 0
 
                 if not self.use_absolute_efficiency:
-                    iam_location = self.geo.ecoinvent_to_iam_location(
-                        dataset["location"]
+                    iam_location = get_ecoinvent_to_iam_location(
+                        self.model, dataset["location"]
                     )
-                    if (
-                        iam_location
-                        in self.iam_data.electricity_efficiencies.coords[
-                            "region"
-                        ].values
-                    ):
+                    if iam_location in efficiency_changes:
                         # Find relative efficiency change indicated by the IAM
-                        scaling_factor = 1 / self.find_iam_efficiency_change(
-                            data=self.iam_data.electricity_efficiencies,
-                            variable=technology,
-                            location=iam_location,
-                        )
+                        scaling_factor = 1 / efficiency_changes[iam_location]
 
                         new_efficiency = float(
                             np.clip(
@@ -1689,13 +1693,9 @@ class Electricity(BaseTransformation):
                         scaling_factor = 1
 
                 else:
-                    new_efficiency = self.find_iam_efficiency_change(
-                        data=self.iam_data.electricity_efficiencies,
-                        variable=technology,
-                        location=self.geo.ecoinvent_to_iam_location(
-                            dataset["location"]
-                        ),
-                    )
+                    new_efficiency = efficiency_changes[
+                        get_ecoinvent_to_iam_location(self.model, dataset["location"])
+                    ]
 
                     # if ei_eff is different from 1 and if the new efficiency
                     # is not NaN or zero, we can rescale the exchanges
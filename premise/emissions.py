@@ -21,6 +21,7 @@ from .transformation import (
     InventorySet,
     List,
     Set,
+    equals_any,
     ws,
 )
 
@@ -86,6 +87,28 @@ class Emissions(BaseTransformation):
         self.version = version
         self.gains_europe = self.prepare_data(iam_data.gains_data_EU)
         self.gains_global = self.prepare_data(iam_data.gains_data_IAM)
+        # values of the GAINS data as arrays, with the position
+        # of each coordinate label, to look up scaling factors by index
+        # and test coordinates for membership
+        self.gains_values = {
+            model: data.transpose("region", "pollutant", "sector", "year").values
+            for model, data in [
+                ("GAINS-EU", self.gains_europe),
+                ("GAINS-IAM", self.gains_global),
+            ]
+        }
+        self.gains_index = {
+            model: {
+                dim: {
+                    label: i for i, label in enumerate(data.coords[dim].values.tolist())
+                }
+                for dim in ["region", "pollutant", "sector", "year"]
+            }
+            for model, data in [
+                ("GAINS-EU", self.gains_europe),
+                ("GAINS-IAM", self.gains_global),
+            ]
+        }
         self.ei_pollutants = fetch_mapping(EI_POLLUTANTS)
         self.gains_pollutant = {v: k for k, v in self.ei_pollutants.items()}
         self.gains_sectors = fetch_mapping(GAINS_SECTORS)
@@ -129,14 +152,14 @@ class Emissions(BaseTransformation):
         for ds in self.database:
             if (
                 ds["name"] in self.rev_gains_map_europe
-                and ds["location"] in self.gains_europe.coords["region"]
+                and ds["location"] in self.gains_index["GAINS-EU"]["region"]
             ):
                 gains_sector = self.rev_gains_map_europe[ds["name"]]
                 self.update_pollutant_emissions(
                     ds,
                     gains_sector,
                     model="GAINS-EU",
-                    regions=self.gains_europe.region.values,
+                    regions=self.gains_index["GAINS-EU"]["region"].keys(),
                 )
                 self.write_log(ds, status="updated")
 
@@ -145,20 +168,20 @@ class Emissions(BaseTransformation):
             if (
                 ds["name"] in self.rev_gains_map_global
                 and self.ecoinvent_to_iam_loc[ds["location"]]
-                in self.gains_global.coords["region"]
+                in self.gains_index["GAINS-IAM"]["region"]
             ):
                 gains_sector = self.rev_gains_map_global[ds["name"]]
                 self.update_pollutant_emissions(
                     ds,
                     gains_sector,
                     model="GAINS-IAM",
-                    regions=self.gains_global.region.values,
+                    regions=self.gains_index["GAINS-IAM"]["region"].keys(),
                 )
 
                 self.write_log(ds, status="updated")
 
     def update_pollutant_emissions(
-        self, dataset: dict, sector: str, model: str, regions: list
+        self, dataset: dict, sector: str, model: str, regions: Set[str]
     ) -> dict:
         """
         Update pollutant emissions based on GAINS data.
@@ -171,9 +194,7 @@ class Emissions(BaseTransformation):
         """
 
         # Update biosphere exchanges according to GAINS emission values
-        for exc in ws.biosphere(
-            dataset, ws.either(*[ws.equals("name", x) for x in self.ei_pollutants])
-        ):
+        for exc in ws.biosphere(dataset, equals_any("name", self.ei_pollutants)):
             gains_pollutant = self.ei_pollutants[exc["name"]]
             scaling_factor = self.find_gains_emissions_change(
                 pollutant=gains_pollutant,
@@ -223,10 +244,11 @@ class Emissions(BaseTransformation):
         :return: a scaling factor
         """
 
-        data = self.gains_europe if model == "GAINS-EU" else self.gains_global
+        model = "GAINS-EU" if model == "GAINS-EU" else "GAINS-IAM"
+        index = self.gains_index[model]
 
         key_exists = all(
-            k in data.coords[dim].values
+            k in index[dim]
             for k, dim in zip(
                 [location, pollutant, sector, self.year],
                 ["region", "pollutant", "sector", "year"],
@@ -234,12 +256,11 @@ class Emissions(BaseTransformation):
         )
 
         if key_exists:
-            scaling_factor = data.loc[
-                dict(
-                    region=location,
-                    pollutant=pollutant,
-                    sector=sector,
-                )
+            scaling_factor = self.gains_values[model][
+                index["region"][location],
+                index["pollutant"][pollutant],
+                index["sector"][sector],
+                index["year"][self.year],
             ]
 
             scaling_factor = np.clip(
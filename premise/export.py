@@ -260,6 +260,36 @@ def biosphere_flows_dictionary(version):
     return csv_dict
 
 
+def get_scenario_values(m: sparse.COO, inds: np.ndarray) -> np.ndarray:
+    """
+    Return the values of `m` across scenarios (its last axis)
+    for each unique (consumer, supplier) pair of indices in `inds`,
+    read from the non-zero coordinates of `m` in a single pass.
+    :param m: sparse array of shape (supplier, consumer, scenario)
+    :param inds: array of unique (consumer, supplier) indices
+    :return: dense array of shape (len(inds), number of scenarios)
+    """
+    values = np.zeros((len(inds), m.shape[-1]))
+
+    if len(inds) == 0 or m.nnz == 0:
+        return values
+
+    # supplier and consumer indices are flattened into a single key
+    inds = np.asarray(inds)
+    keys = inds[:, 1] * m.shape[1] + inds[:, 0]
+    coords_keys = m.coords[0] * m.shape[1] + m.coords[1]
+
+    sorter = np.argsort(keys)
+    positions = np.clip(
+        np.searchsorted(keys, coords_keys, sorter=sorter), 0, len(keys) - 1
+    )
+    found = keys[sorter[positions]] == coords_keys
+
+    values[sorter[positions[found]], m.coords[2][found]] = m.data[found]
+
+    return values
+
+
 def get_list_unique_acts(scenarios: List[dict]) -> list:
     """
     Get a list of unique activities from a list of databases
@@ -684,6 +714,9 @@ def generate_scenario_difference_file(
 
     inds_std = sparse.argwhere((m[..., 1:] == m[..., 0, None]).all(axis=-1).T == False)
 
+    # the values across scenarios are read at once, as columns
+    scenario_values = get_scenario_values(m, inds_std)
+
     for i in inds_std:
         c_name, c_ref, c_cat, c_loc, c_unit, _ = acts_ind[i[0]]
         s_name, s_ref, s_cat, s_loc, s_unit, s_type = acts_ind[i[1]]
@@ -735,8 +768,6 @@ def generate_scenario_difference_file(
             s_type,
         ]
 
-        row.extend(m[i[1], i[0], :])
-
         dataframe_rows.append(row)
 
     columns = [
@@ -755,9 +786,15 @@ def generate_scenario_difference_file(
         "to database",
         "to key",
         "flow type",
-    ] + list_scenarios
+    ]
 
-    df = pd.DataFrame(dataframe_rows, columns=columns)
+    df = pd.concat(
+        [
+            pd.DataFrame(dataframe_rows, columns=columns),
+            pd.DataFrame(scenario_values, columns=list_scenarios),
+        ],
+        axis=1,
+    )
 
     df["to categories"] = None
     df = df.replace({"None": None, np.nan: None})
@@ -25,7 +25,12 @@ from .inventory_imports import (
     get_biosphere_code,
     get_correspondence_bio_flows,
 )
-from .transformation import BaseTransformation, get_shares_from_production_volume
+from .transformation import (
+    BaseTransformation,
+    equals_any,
+    get_ecoinvent_to_iam_location,
+    get_shares_from_production_volume,
+)
 from .utils import HiddenPrints, rescale_exchanges
 
 LOG_CONFIG = DATA_DIR / "utils" / "logging" / "logconfig.yaml"
@@ -845,21 +850,13 @@ class ExternalScenario(BaseTransformation):
         return datatset
 
     def get_region_for_non_null_production_volume(self, i, variables):
-        nz = np.argwhere(
-            (
-                self.external_scenarios_data[i]["production volume"]
-                .sel(variables=variables)
-                .sum(dim=["year", "variables"])
-                > 0
-            ).values
+        volumes = (
+            self.external_scenarios_data[i]["production volume"]
+            .sel(variables=variables)
+            .sum(dim=["year", "variables"])
         )
 
-        return [
-            self.external_scenarios_data[i]["production volume"]
-            .coords["region"][x[0]]
-            .values.item(0)
-            for x in nz
-        ]
+        return volumes.region.values[volumes.values > 0].tolist()
 
     def create_markets(self) -> None:
         """
@@ -1209,8 +1206,13 @@ class ExternalScenario(BaseTransformation):
                 elif dataset["location"] in regions:
                     new_loc = dataset["location"]
 
-                elif self.geo.ecoinvent_to_iam_location(dataset["location"]) in regions:
-                    new_loc = self.geo.ecoinvent_to_iam_location(dataset["location"])
+                elif (
+                    get_ecoinvent_to_iam_location(self.model, dataset["location"])
+                    in regions
+                ):
+                    new_loc = get_ecoinvent_to_iam_location(
+                        self.model, dataset["location"]
+                    )
 
                 elif dataset["location"] in ["GLO", "RoW"]:
                     if "World" in regions:
@@ -1322,7 +1324,7 @@ class ExternalScenario(BaseTransformation):
                     self.database,
                     ws.equals("name", name),
                     ws.equals("reference product", ref),
-                    ws.either(*[ws.equals("location", l) for l in locs]),
+                    equals_any("location", locs),
                 ):
                     # remove all exchanges except production exchanges
                     ds["exchanges"] = [
@@ -1333,8 +1335,13 @@ class ExternalScenario(BaseTransformation):
                         new_loc = "World"
                     elif ds["location"] in regions:
                         new_loc = ds["location"]
-                    elif self.geo.ecoinvent_to_iam_location(ds["location"]) in regions:
-                        new_loc = self.geo.ecoinvent_to_iam_location(ds["location"])
+                    elif (
+                        get_ecoinvent_to_iam_location(self.model, ds["location"])
+                        in regions
+                    ):
+                        new_loc = get_ecoinvent_to_iam_location(
+                            self.model, ds["location"]
+                        )
                     else:
                         new_loc = self.find_best_substitute_suppliers(
                             new_name, new_ref, regions
@@ -1405,7 +1412,7 @@ class ExternalScenario(BaseTransformation):
                     self.database,
                     ws.equals("name", new_name),
                     ws.equals("reference product", new_ref),
-                    ws.either(*[ws.equals("location", r) for r in regions]),
+                    equals_any("location", regions),
                 )
             )
         )
@@ -21,6 +21,7 @@ from .transformation import (
     InventorySet,
     List,
     Tuple,
+    get_ecoinvent_to_iam_location,
     get_shares_from_production_volume,
     get_suppliers_of_a_region,
     np,
@@ -515,6 +516,19 @@ class Fuels(BaseTransformation):
                 exact_name_match=False,
             )
 
+            if hydrogen_efficiency_variable in self.fuel_efficiencies.variables.values:
+                # the efficiency changes of all regions are looked up at once
+                efficiency_changes = dict(
+                    zip(
+                        new_ds,
+                        self.find_iam_efficiency_changes(
+                            data=self.fuel_efficiencies,
+                            variable=hydrogen_efficiency_variable,
+                            locations=list(new_ds),
+                        ).tolist(),
+                    )
+                )
+
             for region, dataset in new_ds.items():
                 # find current energy consumption in dataset
                 initial_energy_consumption = sum(
@@ -545,11 +559,7 @@ class Fuels(BaseTransformation):
                     in self.fuel_efficiencies.variables.values
                 ):
                     # Find scaling factor compared to 2020
-                    scaling_factor = 1 / self.find_iam_efficiency_change(
-                        data=self.fuel_efficiencies,
-                        variable=hydrogen_efficiency_variable,
-                        location=region,
-                    )
+                    scaling_factor = 1 / efficiency_changes[region]
 
                     # new energy consumption
                     new_energy_consumption = scaling_factor * initial_energy_consumption
@@ -1950,7 +1960,7 @@ class Fuels(BaseTransformation):
                 supplier_loc = (
                     dataset["location"]
                     if dataset["location"] in self.regions
-                    else self.geo.ecoinvent_to_iam_location(dataset["location"])
+                    else get_ecoinvent_to_iam_location(self.model, dataset["location"])
                 )
 
                 amount_non_fossil_co2 = sum(
@@ -2459,12 +2469,13 @@ class Fuels(BaseTransformation):
         }
 
         for old_ds in datasets_to_empty:
-            for ds in ws.get_many(
-                self.database,
-                ws.equals("name", old_ds),
-                ws.doesnt_contain_any("location", self.regions),
-            ):
-                self.remove_from_index(ds)
+            self.remove_many_from_index(
+                ws.get_many(
+                    self.database,
+                    ws.equals("name", old_ds),
+                    ws.doesnt_contain_any("location", self.regions),
+                )
+            )
 
         # generate supply datasets for hydrogen
         hydrogen_supply = self.fetch_proxies(
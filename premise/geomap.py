@@ -5,8 +5,9 @@ the IAM locations and ecoinvent locations.
 
 import json
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 from constructive_geometries import Geomatcher
@@ -36,9 +37,11 @@ class Geomap:
         self.setup_geography()
 
     @staticmethod
+    @lru_cache
     def load_constants() -> Dict[str, Any]:
         """
         Load constants from the constants.yaml file.
+        The file is read once, and its contents shared between instances.
         """
         with open(CONSTANTS_FILE, "r", encoding="utf-8") as stream:
             return yaml.safe_load(stream)
@@ -52,9 +55,11 @@ class Geomap:
             return json.load(stream)
 
     @classmethod
+    @lru_cache
     def fetch_topology(cls, model: str) -> Optional[Dict]:
         """
         Find the JSON file containing the topologies of the provided model.
+        The file is read once per model.
         """
         topology_path = TOPOLOGIES_DIR / f"{model.lower()}-topology.json"
         if topology_path.exists():
@@ -65,9 +70,11 @@ class Geomap:
         )
 
     @classmethod
+    @lru_cache
     def get_additional_mapping(cls) -> Dict[str, dict]:
         """
         Return a dictionary with additional ecoinvent to IAM mappings.
+        The file is read once, and its contents shared between instances.
         """
         with open(ECO_IAM_MAPPING_FILE, "r", encoding="utf-8") as stream:
             return yaml.safe_load(stream)
@@ -104,6 +111,21 @@ class Geomap:
                           the IAM region should be returned. By default, `contained` is True.
         :return: list of names of ecoinvent regions
         """
+        # a new list is returned, as callers may modify it
+        return list(self.find_ecoinvent_locations(location, contained))
+
+    @lru_cache
+    def find_ecoinvent_locations(
+        self, location: str, contained: bool = True
+    ) -> Tuple[str, ...]:
+        """
+        Find the corresponding ecoinvent regions given an IAM region.
+        Results are cached, as the same IAM regions are looked up repeatedly.
+        :param location: name of an IAM region
+        :param contained: whether only geographies that are contained within
+                          the IAM region should be returned.
+        :return: tuple of names of ecoinvent regions
+        """
         location_tuple = (str(self.model.upper()), location)
 
         # Start with additional mappings that might exist
@@ -135,9 +157,7 @@ class Geomap:
             ecoinvent_locations = [e for e in ecoinvent_locations if e != "GLO"]
 
         # remove if ``location`` is in the list
-        ecoinvent_locations = [e for e in ecoinvent_locations if e != location]
-
-        return ecoinvent_locations
+        return tuple(e for e in ecoinvent_locations if e != location)
 
     def ecoinvent_to_iam_location(self, location: str) -> str:
         """
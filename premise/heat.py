@@ -3,7 +3,13 @@ Integrates projections regarding heat production and supply.
 """
 
 from .logger import create_logger
-from .transformation import BaseTransformation, IAMDataCollection, List, ws
+from .transformation import (
+    BaseTransformation,
+    IAMDataCollection,
+    List,
+    equals_any,
+    ws,
+)
 
 logger = create_logger("heat")
 
@@ -75,7 +81,7 @@ class Heat(BaseTransformation):
 
         for dataset in ws.get_many(
             self.database,
-            ws.either(*[ws.equals("name", n) for n in fuel_markets]),
+            equals_any("name", fuel_markets),
         ):
             if "log parameters" in dataset:
                 if "fossil CO2 per kg fuel" in dataset["log parameters"]:
@@ -5,14 +5,17 @@ https://chemrxiv.org/engage/chemrxiv/article-details/63ee10cdfcfb27a31fe227df
 
 """
 
+import hashlib
+import weakref
 from functools import lru_cache
+from pathlib import Path
 from typing import Tuple
 
 import numpy as np
 import xarray as xr
 import yaml
-from numpy import ndarray
 from prettytable import ALL, PrettyTable
+from scipy.interpolate import Akima1DInterpolator
 
 from .filesystem_constants import DATA_DIR
 
@@ -20,6 +23,35 @@ IAM_LEADTIMES = DATA_DIR / "consequential" / "leadtimes.yaml"
 IAM_LIFETIMES = DATA_DIR / "consequential" / "lifetimes.yaml"
 
 
+@lru_cache
+def load_yaml(filepath: Path) -> dict:
+    """
+    Load a .yaml file once and keep its content in memory.
+    :param filepath: path to the .yaml file
+    :return: a dictionary with the content of the file
+    """
+    with open(filepath, "r", encoding="utf-8") as stream:
+        return yaml.safe_load(stream)
+
+
+def fetch_tech_values(list_tech: Tuple, filepath: Path) -> np.ndarray:
+    """
+    Fetch values for different technologies from a .yaml file.
+    :param list_tech: technology labels to find values for.
+    :param filepath: path to the .yaml file
+    :return: a numpy array with technology values
+    """
+    dict_ = load_yaml(filepath)
+
+    for tech in list_tech:
+        if tech not in dict_:
+            print(f"WARNING: {tech} not found in {filepath.name}")
+
+    return np.fromiter(
+        (dict_[tech] for tech in list_tech if tech in dict_), dtype=float
+    )
+
+
 @lru_cache
 def get_lifetime(list_tech: Tuple) -> np.ndarray:
     """
@@ -27,21 +59,9 @@ def get_lifetime(list_tech: Tuple) -> np.ndarray:
     :param list_tech: technology labels to find lifetime values for.
     :type list_tech: list
     :return: a numpy array with technology lifetime values
-    :rtype: DataArray
+    :rtype: np.array
     """
-    with open(IAM_LIFETIMES, "r", encoding="utf-8") as stream:
-        dict_ = yaml.safe_load(stream)
-
-    dict_ = {k: v for k, v in dict_.items() if k in list_tech}
-
-    val = []
-    for tech in list_tech:
-        if tech in dict_.keys():
-            val.append(dict_[tech])
-        else:
-            print(f"WARNING: {tech} not found in lifetimes.yaml")
-
-    return np.array(val, dtype=float)
+    return fetch_tech_values(list_tech, IAM_LIFETIMES)
 
 
 @lru_cache
@@ -53,86 +73,391 @@ def get_leadtime(list_tech: Tuple) -> np.ndarray:
     :return: a numpy array with technology lead-time values
     :rtype: np.array
     """
-    with open(IAM_LEADTIMES, "r", encoding="utf-8") as stream:
-        dict_ = yaml.safe_load(stream)
-
-    dict_ = {k: dict_[k] for k in list(list_tech)}
+    return fetch_tech_values(list_tech, IAM_LEADTIMES)
 
-    val = []
-    for tech in list_tech:
-        if tech in dict_.keys():
-            val.append(dict_[tech])
-        else:
-            print(f"WARNING: {tech} not found in leadtimes.yaml")
 
-    return np.array(val, dtype=float)
+@lru_cache
+def get_tech_params(list_tech: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fetch lifetime and lead-time values for different technologies.
+    :param list_tech: technology labels to find values for.
+    :return: numpy arrays with technology lifetime and lead-time values,
+    in the order of `list_tech`
+    """
+    return get_lifetime(list_tech), get_leadtime(list_tech)
 
 
-def fetch_avg_leadtime(leadtime: np.ndarray, shares: [np.ndarray, xr.DataArray]) -> int:
+def fetch_avg_leadtime(leadtime: np.ndarray, shares: np.ndarray) -> np.ndarray:
     """
     Calculate the average lead-time of a market.
+    :param shares: market shares, of shape (variables,) or (region, variables)
+    :return: average lead-time, in whole years
     """
 
-    return (shares * leadtime).sum().astype(int).values.item(0)
+    # NaN shares (e.g., from missing data) do not contribute
+    return np.trunc(np.dot(np.nan_to_num(shares), leadtime)).astype(int)
 
 
-def fetch_avg_capital_replacement_rate(avg_lifetime: int, data: xr.DataArray) -> float:
+def fetch_avg_capital_replacement_rate(
+    avg_lifetime: np.ndarray, data: np.ndarray
+) -> np.ndarray:
     """
     Calculate the average capital replacement rate of a market.
     """
-    return (-1 / avg_lifetime) or 0.0
+    return -1 / avg_lifetime
 
 
 def fetch_capital_replacement_rates(
-    lifetime: np.ndarray, data: xr.DataArray
+    lifetime: np.ndarray, data: np.ndarray
 ) -> np.ndarray:
     """
     Calculate the average capital replacement rate of a market.
     """
-    return (-1 / lifetime * data).values
+    return -1 / lifetime * data
 
 
-def fetch_avg_lifetime(lifetime: np.ndarray, shares: [np.ndarray, xr.DataArray]) -> int:
+def fetch_avg_lifetime(lifetime: np.ndarray, shares: np.ndarray) -> np.ndarray:
     """
     Calculate the average lifetime of a market.
+    :param shares: market shares, of shape (variables,) or (region, variables)
+    :return: average lifetime, in whole years, or 30 years if unknown
+    """
+    avg_lifetime = np.trunc(np.dot(np.nan_to_num(shares), lifetime)).astype(int)
+    return np.where(avg_lifetime == 0, 30, avg_lifetime)
+
+
+def fetch_time_interval(
+    year: int,
+    leadtime: np.ndarray,
+    lifetime: np.ndarray,
+    shares: np.ndarray,
+    range_time: int,
+    duration: int,
+    foresight: bool,
+    lead_time: bool,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate the time interval over which the market growth is measured.
+    Only the average lead-time and lifetime needed by
+    the combination of arguments are calculated.
+    :param shares: market shares, of shape (variables,) or (region, variables)
+    :return: start and end years, and average start and end years
     """
-    return (shares * lifetime).sum().astype(int).values.item(0) or 30
 
+    if range_time and duration:
+        raise ValueError("`range_time` and `duration` cannot be both non-null.")
 
-def fetch_volume_change(data: xr.DataArray, start_year: int, end_year: int) -> ndarray:
+    if range_time:
+        if foresight:
+            start, end = year - range_time, year + range_time
+        else:
+            avg_leadtime = fetch_avg_leadtime(leadtime, shares)
+            start = year + avg_leadtime - range_time
+            end = year + avg_leadtime + range_time
+        return start, end, start, end
+
+    if duration:
+        if foresight:
+            start = year
+        else:
+            start = year + fetch_avg_leadtime(leadtime, shares)
+        return start, start + duration, start, start + duration
+
+    if foresight:
+        start = year - fetch_avg_leadtime(leadtime, shares)
+        if lead_time:
+            return start, year, year - fetch_avg_lifetime(lifetime, shares), year
+        return start, year, start, year
+
+    return (
+        year,
+        year + fetch_avg_leadtime(leadtime, shares),
+        year,
+        year + fetch_avg_lifetime(lifetime, shares),
+    )
+
+
+def fetch_volume_change(
+    totals: np.ndarray, years: np.ndarray, start_year: np.ndarray, end_year: np.ndarray
+) -> np.ndarray:
     """
-    Calculate the volume change of a market.
+    Calculate the volume change of the markets.
+    :param totals: total production volume of the markets, of shape (region, year)
+    :param years: consecutive years of the production volumes
+    :param start_year: start year of each market, of shape (region,)
+    :param end_year: end year of each market, of shape (region,)
+    :return: volume change of each market, of shape (region,)
     """
 
-    return (
-        (
-            data.interp(year=end_year).sum(dim="variables")
-            - data.interp(year=start_year).sum(dim="variables")
+    r_idx = np.arange(totals.shape[0])
+
+    def volume_at(year_of_regions: np.ndarray) -> np.ndarray:
+        # years outside the data are counted as a zero production volume
+        idx = np.clip(year_of_regions - years[0], 0, len(years) - 1)
+        return np.where(years[idx] == year_of_regions, totals[r_idx, idx], 0)
+
+    return (volume_at(end_year) - volume_at(start_year)) / (end_year - start_year)
+
+
+def measure_weighted_slope(slope: np.ndarray, short_slope: np.ndarray) -> np.ndarray:
+    """
+    Weight the slope of the time interval by the slope
+    of its last part (measurement method 3).
+    :param slope: slope over the time interval
+    :param short_slope: slope over the last part of the time interval
+    :return: weighted slope
+    """
+
+    x = np.divide(
+        short_slope,
+        slope,
+        out=np.zeros(short_slope.shape, dtype=float),
+        where=slope != 0,
+    )
+
+    # 2 * (logistic(x - 1) - 0.5), which saturates to -1 or 1
+    # without overflowing for large slope ratios
+    split_year = np.tanh(0.5 * (x - 1))
+
+    return slope + slope * split_year
+
+
+def measure_split_years(
+    data: np.ndarray, cap_repl_rate: [np.ndarray, None], decreasing: bool
+) -> np.ndarray:
+    """
+    Sum the normalized year-to-year production changes
+    of each supplier over the time interval (measurement method 4).
+    :param data: production volumes over the time interval, of shape (variables, year)
+    :param cap_repl_rate: capital replacement rates, if used as baseline
+    :param decreasing: True if the market decreases faster than the capital renewal rate
+    :return: sum of the normalized production changes
+    """
+
+    # production change of each supplier between consecutive years
+    market_shares_split = np.diff(data, axis=-1)
+
+    if cap_repl_rate is not None:
+        # In cases where a technology is fully phased out somewhere during the time interval we do not want to add capital replacement rate
+        market_shares_split -= np.where(
+            data[:, :-1] != 0, np.reshape(cap_repl_rate, (-1, 1)), 0
         )
-        / (end_year - start_year)
-    ).values
+
+    if decreasing:
+        # we remove suppliers with a positive growth
+        market_shares_split[market_shares_split > 0] = 0
+        market_shares_split /= np.nansum(market_shares_split, axis=0, keepdims=True)
+        # we reverse the sign so that the suppliers are still seen as negative in the next step
+        market_shares_split *= -1
+
+    else:
+        # we remove suppliers with a negative growth
+        market_shares_split[market_shares_split < 0] = 0
+        market_shares_split /= np.nansum(market_shares_split, axis=0, keepdims=True)
+
+    return market_shares_split.sum(axis=1)
 
 
-def remove_constrained_suppliers(data: xr.DataArray) -> xr.DataArray:
+def normalize_marginal_shares(
+    marginal_shares: np.ndarray, decreasing: np.ndarray
+) -> np.ndarray:
     """
-    Remove the shares of suppliers that are constrained from the market.
+    Turn the measured growth of each supplier into marginal shares.
+    :param marginal_shares: measured growth, of shape (region, variables)
+    :param decreasing: True for regions where the market decreases faster
+    than the average capital renewal rate, of shape (region,)
+    :return: marginal shares, which sum to 1 for each region
+    """
+
+    marginal_shares = marginal_shares.round(3)
+
+    # we remove NaNs and np.inf
+    marginal_shares[np.isnan(marginal_shares) | np.isposinf(marginal_shares)] = 0
+
+    marginal_shares = np.where(
+        decreasing[:, None],
+        # market decreasing faster than the average capital renewal rate
+        # in this case, the idea is that oldest/non-competitive technologies
+        # are likely to supply by increasing their lifetime
+        # as the market does not justify additional capacity installation:
+        # we remove suppliers with a positive growth
+        # and we reverse the sign of negative growth suppliers
+        -np.minimum(marginal_shares, 0),
+        # increasing market or
+        # market decreasing slowlier than the
+        # capital renewal rate:
+        # we remove suppliers with a negative growth
+        np.maximum(marginal_shares, 0),
+    )
+
+    marginal_shares /= marginal_shares.sum(axis=1, keepdims=True)
+
+    return marginal_shares
+
+
+class IAMValues:
     """
+    Hashable reference to IAM data values, used as a cache key.
+    Values are only weakly referenced, so that cached results do not
+    keep the IAM data in memory. They are compared element-wise while
+    both are alive, and by a full-length digest otherwise.
+    """
+
+    __slots__ = ("digest", "values")
+
+    def __init__(self, values: np.ndarray):
+        """
+        :param values: C-contiguous IAM data values
+        """
+        self.digest = (
+            hashlib.blake2b(values).digest(),
+            values.dtype.str,
+            values.shape,
+        )
+        self.values = weakref.ref(values)
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IAMValues) or self.digest != other.digest:
+            return False
+
+        values, other_values = self.values(), other.values()
+        if values is None or other_values is None:
+            return True
+
+        return values is other_values or np.array_equal(
+            values, other_values, equal_nan=True
+        )
+
 
-    # we set CHP suppliers to zero
+def interpolate_full_years(data: xr.DataArray) -> xr.DataArray:
+    """
+    Interpolate the IAM data to every year between its first and last year.
+    Interpolation is done using Akima splines, and is only done once
+    for identical IAM data, as markets are measured for several years.
+    :param data: IAM data, with region, variables and year dimensions
+    :return: IAM data for every year, of shape (region, variables, year)
+    """
+
+    data = data.transpose("region", "variables", "year")
+    raw = np.ascontiguousarray(data.values)
+
+    # the cached data array is copied, as it is modified by the caller
+    return interpolate_iam_data(
+        IAMValues(raw),
+        tuple(data.region.values.tolist()),
+        tuple(data.variables.values.tolist()),
+        tuple(data.year.values.tolist()),
+    ).copy()
+
+
+@lru_cache(maxsize=8)
+def interpolate_iam_data(
+    values: IAMValues,
+    regions: Tuple,
+    variables: Tuple,
+    years: Tuple,
+) -> xr.DataArray:
+    """
+    Interpolate IAM data, referenced by a digest of its values,
+    to every year between its first and last year.
+    :param values: IAM data values, of shape (region, variables, year)
+    :param regions: IAM regions
+    :param variables: IAM variables
+    :param years: years of the IAM data
+    :return: IAM data for every year, of shape (region, variables, year)
+    """
+
+    raw = values.values()
+    known_years = np.array(years)
+    years_to_interp_for = np.arange(known_years.min(), known_years.max() + 1)
+    coords = {
+        "region": list(regions),
+        "variables": list(variables),
+        "year": years_to_interp_for,
+    }
+
+    if (
+        known_years.size > 1
+        and np.all(np.diff(known_years) > 0)
+        and not np.isnan(raw).any()
+    ):
+        # without missing values, all the series share the same
+        # interpolation points, and can be interpolated at once
+        interpolated = Akima1DInterpolator(known_years, raw, axis=-1)(
+            years_to_interp_for
+        )
+        interpolated[..., known_years - known_years.min()] = raw
+
+        return xr.DataArray(
+            interpolated, dims=["region", "variables", "year"], coords=coords
+        )
+
+    data_full = xr.DataArray(
+        np.nan, dims=["region", "variables", "year"], coords=coords
+    )
+    data_full.loc[{"year": list(years)}] = raw
+
+    return data_full.interpolate_na(dim="year", method="akima")
+
+
+@lru_cache
+def get_constrained_suppliers(list_tech: Tuple) -> np.ndarray:
+    """
+    Flag the suppliers that are constrained.
+    :param list_tech: technology labels of the market
+    :return: a boolean numpy array, True for constrained suppliers
+    """
+
+    # CHP suppliers are constrained
     # as electricity production is not a
     # determining product for CHPs
     tech_to_ignore = ["CHP", "biomethane", "biogas"]
-    data.loc[
-        dict(
-            variables=[
-                v for v in data.variables.values if any(x in v for x in tech_to_ignore)
-            ],
-        )
-    ] = 0
+
+    return np.array(
+        [any(x in tech for x in tech_to_ignore) for tech in list_tech], dtype=bool
+    )
+
+
+def remove_constrained_suppliers(data: np.ndarray, list_tech: Tuple) -> np.ndarray:
+    """
+    Remove the shares of suppliers that are constrained from the market.
+    :param data: production volumes, of shape (region, variables, year)
+    :param list_tech: technology labels of the market
+    :return: production volumes, with constrained suppliers set to zero
+    """
+
+    data[:, get_constrained_suppliers(list_tech), :] = 0
 
     return data
 
 
+def build_market_shares(
+    data: xr.DataArray, year: int, marginal_shares: np.ndarray
+) -> xr.DataArray:
+    """
+    Wrap the marginal shares of each region in a data array.
+    :param data: IAM data the marginal shares are calculated from
+    :param year: year of the marginal market mixes
+    :param marginal_shares: marginal shares, of shape (region, variables)
+    :return: marginal market mixes, with the dimensions of `data`
+    """
+
+    return xr.DataArray(
+        marginal_shares[:, :, None],
+        dims=["region", "variables", "year"],
+        coords={
+            "region": data.region,
+            "variables": data.variables,
+            "year": [year],
+        },
+        attrs=data.attrs,
+        name=data.name,
+    ).transpose(*data.dims)
+
+
 def consequential_method(
     data: xr.DataArray, year: int, args: dict, sector: str
 ) -> xr.DataArray:
@@ -174,623 +499,258 @@ def consequential_method(
     weighted_slope_start: float = args.get("weighted slope start", 0.75)
     weighted_slope_end: float = args.get("weighted slope end", 1.0)
 
-    market_shares = xr.zeros_like(
-        data.interp(year=[year]),
-    )
-
     # Since there can be different start and end values,
     # we interpolate the entire data of the IAM instead
     # of doing it each time over
-    minimum = min(data.year.values)
-    maximum = max(data.year.values)
-    years_to_interp_for = list(range(minimum, maximum + 1))
-
-    data_full = xr.DataArray(
-        np.nan,
-        dims=["region", "variables", "year"],
-        coords={
-            "region": data.region,
-            "year": years_to_interp_for,
-            "variables": data.variables,
-        },
+    data_full = interpolate_full_years(data)
+
+    techs = tuple(data.variables.values.tolist())
+    regions = data.region.values
+    n_regions = len(regions)
+    lifetime, leadtime = get_tech_params(techs)
+
+    # the numerical work is done on a plain numpy array
+    # of shape (region, variables, year), as selecting
+    # values by label in xarray is comparatively slow.
+    # The array is kept C-contiguous, so that the reductions
+    # along the year axis run over contiguous memory
+    arr = np.ascontiguousarray(
+        data_full.transpose("region", "variables", "year").values, dtype=np.float64
     )
-    data_full.loc[{"year": data.year}] = data
-    # interpolation is done using cubic spline interpolation
-    data_full = data_full.interpolate_na(dim="year", method="akima")
+    # constrained suppliers are removed once for all regions,
+    # so that every region is measured against the same data
+    arr = remove_constrained_suppliers(arr, techs)
+    years = data_full.year.values
+    # total production volume of each market, of shape (region, year)
+    totals = np.nansum(arr, axis=1)
+
+    r_idx = np.arange(n_regions)
+
+    def year_index(years_of_regions: np.ndarray) -> np.ndarray:
+        # position of each region's year, clipped to the years of the data
+        idx = np.asarray(years_of_regions, dtype=int) - years[0]
+        return np.clip(idx, 0, len(years) - 1)
+
+    def values_at(years_of_regions: np.ndarray) -> np.ndarray:
+        # values of each region at its own year, of shape (region, variables)
+        return arr[r_idx, :, year_index(years_of_regions)]
+
+    # we don't yet know the exact start year
+    # of the time interval, so as an approximation
+    # we use for current_shares the start year
+    # of the change
+    year_i = year_index(year)
+    shares = arr[:, :, year_i] / totals[:, year_i, None]
+
+    # if shares contains only NaNs, we give its elements the value 1
+    shares[np.isnan(shares).all(axis=1)] = 1
+
+    # the time interval, the average capital replacement rate
+    # and the volume change are specific to each region,
+    # as they depend on the current shares of the market
+    try:
+        start, end, avg_start, avg_end = (
+            np.broadcast_to(y, (n_regions,))
+            for y in fetch_time_interval(
+                year=year,
+                leadtime=leadtime,
+                lifetime=lifetime,
+                shares=shares,
+                range_time=range_time,
+                duration=duration,
+                foresight=foresight,
+                lead_time=lead_time,
+            )
+        )
+
+    except ValueError:
+        print(
+            f"The combination of range_time, duration, foresight, and lead_time {range_time, duration, foresight, lead_time} "
+            "is not possible. Please check your input. Specifically, if `range_time` is non-null, `duration` must be null, "
+            "and vice versa."
+        )
+        return build_market_shares(data, year, np.zeros(arr.shape[:2]))
 
-    techs = tuple(data_full.variables.values.tolist())
-    leadtime = get_leadtime(techs)
-    lifetime = get_lifetime(techs)
+    # Now that we do know the start year of the time interval,
+    # we can use this to "more accurately" calculate the current shares
+    data_avg_start = values_at(avg_start)
+    shares = data_avg_start / totals[r_idx, year_index(avg_start), None]
+
+    # we first need to calculate the average capital replacement rate of the market
+    # which is here defined as the inverse of the production-weighted average lifetime
+    avg_lifetime = fetch_avg_lifetime(lifetime, shares)
+    avg_cap_repl_rate = fetch_avg_capital_replacement_rate(avg_lifetime, data_avg_start)
+
+    volume_change = fetch_volume_change(totals, years, avg_start, avg_end)
 
     # create a list to store variables values
     # for each region
     # to print a pretty table at the end
-    summary = []
-
-    for region in data.coords["region"].values:
-        # we don't yet know the exact start year
-        # of the time interval, so as an approximation
-        # we use for current_shares the start year
-        # of the change
-        shares = data_full.sel(region=region, year=year) / data_full.sel(
-            region=region, year=year
-        ).sum(dim="variables")
-
-        # if shares contains only NaNs, we give its elements the value 1
-        if shares.isnull().all():
-            shares = xr.ones_like(shares)
-
-        time_parameters = {
-            (False, False, False, False): {
-                "start": year,
-                "end": year + fetch_avg_leadtime(leadtime, shares),
-                "start_avg": year,
-                "end_avg": year + fetch_avg_lifetime(lifetime=lifetime, shares=shares),
-            },
-            (False, False, True, False): {
-                "start": year - fetch_avg_leadtime(leadtime, shares),
-                "end": year,
-                "start_avg": year - fetch_avg_leadtime(leadtime, shares),
-                "end_avg": year,
-            },
-            (False, False, False, True): {
-                "start": year,
-                "end": year + fetch_avg_leadtime(leadtime, shares),
-                "start_avg": year,
-                "end_avg": year + fetch_avg_lifetime(lifetime=lifetime, shares=shares),
-            },
-            (False, False, True, True): {
-                "start": year - fetch_avg_leadtime(leadtime, shares),
-                "end": year,
-                "start_avg": year
-                - fetch_avg_lifetime(lifetime=lifetime, shares=shares),
-                "end_avg": year,
-            },
-            (True, False, False, False): {
-                "start": year + fetch_avg_leadtime(leadtime, shares) - range_time,
-                "end": year + fetch_avg_leadtime(leadtime, shares) + range_time,
-                "start_avg": year + fetch_avg_leadtime(leadtime, shares) - range_time,
-                "end_avg": year + fetch_avg_leadtime(leadtime, shares) + range_time,
-            },
-            (True, False, True, False): {
-                "start": year - range_time,
-                "end": year + range_time,
-                "start_avg": year - range_time,
-                "end_avg": year + range_time,
-            },
-            (True, False, False, True): {
-                "start": year + fetch_avg_leadtime(leadtime, shares) - range_time,
-                "end": year + fetch_avg_leadtime(leadtime, shares) + range_time,
-                "start_avg": year + fetch_avg_leadtime(leadtime, shares) - range_time,
-                "end_avg": year + fetch_avg_leadtime(leadtime, shares) + range_time,
-            },
-            (True, False, True, True): {
-                "start": year - range_time,
-                "end": year + range_time,
-                "start_avg": year - range_time,
-                "end_avg": year + range_time,
-            },
-            (False, True, False, False): {
-                "start": year + fetch_avg_leadtime(leadtime, shares),
-                "end": year + fetch_avg_leadtime(leadtime, shares) + duration,
-                "start_avg": year + fetch_avg_leadtime(leadtime, shares),
-                "end_avg": year + fetch_avg_leadtime(leadtime, shares) + duration,
-            },
-            (False, True, True, False): {
-                "start": year,
-                "end": year + duration,
-                "start_avg": year,
-                "end_avg": year + duration,
-            },
-            (False, True, False, True): {
-                "start": year + fetch_avg_leadtime(leadtime, shares),
-                "end": year + fetch_avg_leadtime(leadtime, shares) + duration,
-                "start_avg": year + fetch_avg_leadtime(leadtime, shares),
-                "end_avg": year + fetch_avg_leadtime(leadtime, shares) + duration,
-            },
-            (False, True, True, True): {
-                "start": year,
-                "end": year + duration,
-                "start_avg": year,
-                "end_avg": year + duration,
-            },
-        }
-
-        try:
-            params = time_parameters[
-                (bool(range_time), bool(duration), foresight, lead_time)
-            ]
-            start = params["start"]
-            end = params["end"]
-
-            avg_start = params["start_avg"]
-            avg_end = params["end_avg"]
-
-        except KeyError:
-            print(
-                f"The combination of range_time, duration, foresight, and lead_time {range_time, duration, foresight, lead_time} "
-                "is not possible. Please check your input. Specifically, if `range_time` is non-null, `duration` must be null, "
-                "and vice versa."
+    summary = [
+        (
+            region,
+            measurement,
+            foresight,
+            duration,
+            avg_start[r_i],
+            avg_end[r_i],
+            np.round(avg_cap_repl_rate[r_i], 2),
+            np.round(volume_change[r_i], 2),
+        )
+        for r_i, region in enumerate(regions)
+    ]
+
+    # market decreasing faster than the average capital renewal rate
+    if capital_repl_rate:
+        decreasing = volume_change < avg_cap_repl_rate
+    else:
+        decreasing = volume_change < 0
+
+    # as with the year mask of the linear regression, the time interval
+    # is limited to the years of the IAM data, so that markets measured
+    # near the end of the time horizon do not look for missing years
+    start = np.clip(start, years[0], years[-1])
+    end = np.clip(end, years[0], years[-1])
+
+    if measurement in [0, 2, 3, 5]:
+        data_start = values_at(start)
+        data_end = values_at(end)
+
+    # get the capital replacement rate
+    # which is here defined as -1 / lifetime
+    cap_repl_rate = fetch_capital_replacement_rates(lifetime, data_avg_start)
+
+    # marginal shares of each region, of shape (region, variables)
+    marginal_shares = np.zeros(arr.shape[:2])
+
+    # second, we measure production growth
+    # within the determined time interval
+    # for each technology
+    # using the selected measuring method and baseline
+    if measurement == 0:
+        # if the capital replacement rate is not used,
+        marginal_shares = (data_end - data_start) / (end - start)[:, None]
+
+        if capital_repl_rate:
+            # subtract the capital replacement (which is negative) rate
+            # to the changes market share
+            marginal_shares -= cap_repl_rate
+
+    if measurement in [1, 2]:
+        # only the years covering the time intervals of
+        # all regions are used to measure the growth
+        window = slice(
+            np.searchsorted(years, start.min()),
+            np.searchsorted(years, end.max(), side="right"),
+        )
+        window_years = years[window]
+        window_arr = arr[:, :, window]
+        mask = (window_years >= start[:, None]) & (window_years <= end[:, None])
+
+    if measurement == 1:
+        # slope of the linear regression over the years of the time
+        # interval, i.e., sum((t - t_mean) * y) / sum((t - t_mean) ** 2)
+        t_mean = (window_years * mask).sum(axis=1, keepdims=True) / mask.sum(
+            axis=1, keepdims=True
+        )
+        t_centered = np.where(mask, window_years - t_mean, 0)
+
+        marginal_shares = (
+            np.einsum(
+                "rvy,ry->rv", np.where(mask[:, None, :], window_arr, 0), t_centered
             )
-            continue
+            / (t_centered**2).sum(axis=1)[:, None]
+        )
 
-        # Now that we do know the start year of the time interval,
-        # we can use this to "more accurately" calculate the current shares
-        shares = data_full.sel(region=region, year=avg_start) / data_full.sel(
-            region=region, year=avg_start
-        ).sum(dim="variables")
+        if capital_repl_rate:
+            # subtract the capital replacement (which is negative) rate
+            # to the changes market share
+            marginal_shares -= cap_repl_rate
+
+    if measurement == 2:
+        coeff = np.nansum(np.where(mask[:, None, :], window_arr, 0), axis=-1)
+
+        n = (end - start)[:, None]
+
+        total_area = 0.5 * (2 * coeff - data_end - data_start)
+        baseline_area = data_start * n
+
+        marginal_shares = (total_area - baseline_area) / n
+
+        if capital_repl_rate:
+            # this bit differs from above:
+            # the capital replacement is integrated over the time interval
+            # subtract the capital replacement (which is negative) rate
+            # to the changes market share
+            n_avg = (avg_end - avg_start)[:, None]
+            marginal_shares -= cap_repl_rate * 0.5 * n_avg * n_avg
+
+    if measurement == 3:
+        slope = (data_end - data_start) / (end - start)[:, None]
+
+        # the short slope is measured between whole years,
+        # as the data is given for each year
+        n = end - start
+        short_slope_start = np.floor(start + n * weighted_slope_start).astype(int)
+        short_slope_end = np.floor(start + n * weighted_slope_end).astype(int)
+        short_n = (short_slope_end - short_slope_start)[:, None]
+
+        # a short slope of zero width tells nothing about the last part
+        # of the time interval, in which case the slope is not weighted
+        short_slope = np.divide(
+            values_at(short_slope_end) - values_at(short_slope_start),
+            short_n,
+            out=slope.copy(),
+            where=short_n != 0,
+        )
 
-        # we first need to calculate the average capital replacement rate of the market
-        # which is here defined as the inverse of the production-weighted average lifetime
+        if capital_repl_rate:
+            slope -= cap_repl_rate
+            short_slope -= cap_repl_rate
 
-        # again was put in to deal with Nan values in data
-        avg_lifetime = fetch_avg_lifetime(lifetime, shares)
+        marginal_shares = measure_weighted_slope(slope, short_slope)
 
-        # again was put in to deal with Nan values in data
-        avg_cap_repl_rate = fetch_avg_capital_replacement_rate(
-            avg_lifetime, data_full.sel(region=region, year=avg_start)
-        )
+    if measurement == 4:
+        n = avg_end - avg_start
 
-        volume_change = fetch_volume_change(
-            data_full.sel(region=region), avg_start, avg_end
-        )
+        # use average start and end years
+        idx_start, idx_end = year_index(avg_start), year_index(avg_end)
 
-        data_full = remove_constrained_suppliers(data_full)
-
-        # second, we measure production growth
-        # within the determined time interval
-        # for each technology
-        # using the selected measuring method and baseline
-        if measurement == 0:
-            # if the capital replacement rate is not used,
-            if isinstance(start, np.ndarray):
-                data_start = (
-                    data_full.sel(
-                        region=region,
-                        year=start,
-                    )
-                    * np.identity(start.shape[0])
-                ).sum(dim="variables")
-            else:
-                data_start = data_full.sel(
-                    region=region,
-                    year=start,
-                )
-
-            if isinstance(end, np.ndarray):
-                data_end = (
-                    data_full.sel(
-                        region=region,
-                        year=end,
-                    )
-                    * np.identity(end.shape[0])
-                ).sum(dim="variables")
-            else:
-                data_end = data_full.sel(
-                    region=region,
-                    year=end,
-                )
-
-            market_shares.loc[{"region": region}] = (
-                (data_end.values - data_start.values) / (end - start)
-            )[:, None]
-
-            if capital_repl_rate:
-                # get the capital replacement rate
-                # which is here defined as -1 / lifetime
-                cap_repl_rate = fetch_capital_replacement_rates(
-                    lifetime, data_full.sel(region=region, year=avg_start)
-                )
-
-                # subtract the capital replacement (which is negative) rate
-                # to the changes market share
-                market_shares.loc[{"region": region}] -= cap_repl_rate[:, None]
-
-        if measurement == 1:
-            if isinstance(end, np.ndarray):
-                new_end = np.zeros_like(data_full.sel(region=region))
-                new_end[:, :] = end[:, None]
-                end = new_end
-
-            if isinstance(start, np.ndarray):
-                new_start = np.zeros_like(data_full.sel(region=region))
-                new_start[:, :] = start[:, None]
-                start = new_start
-
-            mask_end = data_full.sel(region=region).year.values[None, :] <= end
-            mask_start = data_full.sel(region=region).year.values[None, :] >= start
-            mask = mask_end & mask_start
-
-            maskxr = xr.zeros_like(data_full.sel(region=region))
-            maskxr += mask
-
-            masked_data = data_full.sel(region=region).where(maskxr, drop=True)
-
-            coeff = masked_data.polyfit(dim="year", deg=1)
-
-            market_shares.loc[{"region": region}] = coeff.polyfit_coefficients[
-                0
-            ].values[:, None]
-
-            if capital_repl_rate:
-                # get the capital replacement rate
-                # which is here defined as -1 / lifetime
-                cap_repl_rate = fetch_capital_replacement_rates(
-                    lifetime, data_full.sel(region=region, year=avg_start)
-                )
-
-                # subtract the capital replacement (which is negative) rate
-                # to the changes market share
-                market_shares.loc[{"region": region}] -= cap_repl_rate[:, None]
-
-        if measurement == 2:
-            if isinstance(end, np.ndarray):
-                data_end = (
-                    data_full.sel(
-                        region=region,
-                        year=end,
-                    )
-                    * np.identity(end.shape[0])
-                ).sum(dim="variables")
-
-                new_end = np.zeros_like(data_full.sel(region=region))
-                new_end[:, :] = end[:, None]
-                end = new_end
-            else:
-                data_end = data_full.sel(
-                    region=region,
-                    year=end,
-                )
-
-            if isinstance(start, np.ndarray):
-                data_start = (
-                    data_full.sel(
-                        region=region,
-                        year=start,
-                    )
-                    * np.identity(start.shape[0])
-                ).sum(dim="variables")
-
-                new_start = np.zeros_like(data_full.sel(region=region))
-                new_start[:, :] = start[:, None]
-                start = new_start
-            else:
-                data_start = data_full.sel(
-                    region=region,
-                    year=start,
-                )
-
-            mask_end = data_full.sel(region=region).year.values[None, :] <= end
-            mask_start = data_full.sel(region=region).year.values[None, :] >= start
-            mask = mask_end & mask_start
-
-            maskxr = xr.zeros_like(data_full.sel(region=region))
-            maskxr += mask
-
-            masked_data = data_full.sel(region=region).where(maskxr, drop=True)
-
-            coeff = masked_data.sum(dim="year").values
-
-            if isinstance(end, np.ndarray):
-                end = np.mean(end, 1)
-
-            if isinstance(start, np.ndarray):
-                start = np.mean(start, 1)
-
-            n = end - start
-
-            total_area = 0.5 * (2 * coeff - data_end.values - data_start.values)
-
-            if isinstance(n, np.ndarray):
-                if n.shape != data_start.shape:
-                    n = n.mean(axis=1)
-
-            baseline_area = data_start * n
-
-            market_shares.loc[{"region": region}] = (
-                (total_area - baseline_area) / n
-            ).values[:, None]
-
-            if capital_repl_rate:
-                # this bit differs from above
-                # get the capital replacement rate
-                # which is here defined as -1 / lifetime
-                cap_repl_rate = (
-                    fetch_capital_replacement_rates(
-                        lifetime, data_full.sel(region=region, year=avg_start)
-                    )
-                    * ((avg_end - avg_start) ^ 2)
-                    * 0.5
-                )
-
-                # subtract the capital replacement (which is negative) rate
-                # to the changes market share
-                market_shares.loc[{"region": region}] -= cap_repl_rate[:, None]
-
-        if measurement == 3:
-            if isinstance(end, np.ndarray):
-                data_end = (
-                    data_full.sel(
-                        region=region,
-                        year=end,
-                    )
-                    * np.identity(end.shape[0])
-                ).sum(dim="variables")
-
-            else:
-                data_end = data_full.sel(
-                    region=region,
-                    year=end,
-                )
-
-            if isinstance(start, np.ndarray):
-                data_start = (
-                    data_full.sel(
-                        region=region,
-                        year=start,
-                    )
-                    * np.identity(start.shape[0])
-                ).sum(dim="variables")
-
-            else:
-                data_start = data_full.sel(
-                    region=region,
-                    year=start,
-                )
-
-            slope = (data_end.values - data_start.values) / (end - start)
-
-            short_slope_start = start + (end - start) * weighted_slope_start
-            short_slope_end = start + (end - start) * weighted_slope_end
-
-            if isinstance(short_slope_start, np.ndarray):
-                data_short_slope_start = (
-                    data_full.sel(
-                        region=region,
-                        year=short_slope_start,
-                    )
-                    * np.identity(short_slope_start.shape[0])
-                ).sum(dim="variables")
-
-            else:
-                data_short_slope_start = data_full.sel(
-                    region=region,
-                    year=short_slope_start,
-                )
-
-            if isinstance(short_slope_end, np.ndarray):
-                data_short_slope_end = (
-                    data_full.sel(
-                        region=region,
-                        year=short_slope_end,
-                    )
-                    * np.identity(short_slope_end.shape[0])
-                ).sum(dim="variables")
-
-            else:
-                data_short_slope_end = data_full.sel(
-                    region=region,
-                    year=short_slope_end,
-                )
-
-            short_slope = (
-                data_short_slope_end.values - data_short_slope_start.values
-            ) / (short_slope_end - short_slope_start)
-
-            if short_slope.shape != slope.shape:
-                short_slope = np.repeat(short_slope, slope.shape[0])
-
-            if capital_repl_rate:
-                cap_repl_rate = fetch_capital_replacement_rates(
-                    lifetime, data_full.sel(region=region, year=avg_start)
-                )
-                slope -= cap_repl_rate
-                short_slope -= cap_repl_rate
-
-            x = np.divide(
-                short_slope,
-                slope,
-                out=np.zeros(short_slope.shape, dtype=float),
-                where=slope != 0,
+        for r_i in range(n_regions):
+            marginal_shares[r_i] = measure_split_years(
+                arr[r_i, :, idx_start[r_i] : idx_end[r_i] + 1],
+                cap_repl_rate[r_i] if capital_repl_rate else None,
+                decreasing[r_i],
             )
 
-            split_year = np.where(x < 0, -1, 1)
-            split_year = np.where(
-                (x > -500) & (x < 500),
-                2 * (np.exp(-1 + x) / (1 + np.exp(-1 + x)) - 0.5),
-                split_year,
-            )
+        marginal_shares /= n[:, None]
+
+    if measurement == 5:
+        # if the capital replacement rate is not used,
+        marginal_shares = (data_end - data_start) / (end - start)[:, None]
+
+        if capital_repl_rate:
+            # subtract the capital replacement (which is negative) rate
+            # to the changes market share
+            marginal_shares -= cap_repl_rate
 
-            market_shares.loc[{"region": region}] = (slope + slope * split_year)[
-                :, None
-            ]
-
-        if measurement == 4:
-            n = avg_end - avg_start
-
-            if isinstance(n, int):
-                n = np.array([n])
-
-            # use average start and end years
-            split_years = range(avg_start, avg_end)
-            for split_year in split_years:
-                market_shares_split = xr.zeros_like(market_shares)
-                market_shares_split.loc[{"region": region}] = (
-                    data_full.sel(region=region, year=split_year + 1)
-                    - data_full.sel(region=region, year=split_year)
-                ).values[:, None]
-
-                if capital_repl_rate:
-                    cap_repl_rate = fetch_capital_replacement_rates(
-                        lifetime, data_full.sel(region=region, year=avg_start)
-                    )
-                    # In cases where a technology is fully phased out somewhere during the time interval we do not want to add capital replacement rate
-                    mask = data_full.sel(region=region, year=split_year) != 0
-                    cap_repl_rate = cap_repl_rate * mask.values
-                    market_shares_split.loc[{"region": region}] -= cap_repl_rate[
-                        :, None
-                    ]
-
-                if (not capital_repl_rate and volume_change < 0) or (
-                    capital_repl_rate and volume_change < avg_cap_repl_rate
-                ):
-                    # we remove suppliers with a positive growth
-                    market_shares_split.loc[{"region": region}].values[
-                        market_shares_split.loc[{"region": region}].values > 0
-                    ] = 0
-                    market_shares_split.loc[
-                        {"region": region}
-                    ] /= market_shares_split.loc[{"region": region}].sum(
-                        dim="variables"
-                    )
-                    # we reverse the sign so that the suppliers are still seen as negative in the next step
-                    market_shares_split.loc[{"region": region}] *= -1
-
-                else:
-                    # we remove suppliers with a negative growth
-                    market_shares_split.loc[{"region": region}].values[
-                        market_shares_split.loc[{"region": region}].values < 0
-                    ] = 0
-                    market_shares_split.loc[
-                        {"region": region}
-                    ] /= market_shares_split.loc[{"region": region}].sum(
-                        dim="variables"
-                    )
-
-                market_shares.loc[{"region": region}] += market_shares_split.loc[
-                    {"region": region}
-                ]
-
-            market_shares.loc[{"region": region}] /= n[:, None]
-
-        if measurement == 5:
-            # if the capital replacement rate is not used,
-
-            if isinstance(start, np.ndarray):
-                data_start = (
-                    data_full.sel(
-                        region=region,
-                        year=start,
-                    )
-                    * np.identity(start.shape[0])
-                ).sum(dim="variables")
-            else:
-                data_start = data_full.sel(
-                    region=region,
-                    year=start,
-                )
-
-            if isinstance(end, np.ndarray):
-                data_end = (
-                    data_full.sel(
-                        region=region,
-                        year=end,
-                    )
-                    * np.identity(end.shape[0])
-                ).sum(dim="variables")
-            else:
-                data_end = data_full.sel(
-                    region=region,
-                    year=end,
-                )
-
-            market_shares.loc[{"region": region}] = (
-                (data_end.values - data_start.values) / (end - start)
-            )[:, None]
-
-            if capital_repl_rate:
-                # get the capital replacement rate
-                # which is here defined as -1 / lifetime
-                cap_repl_rate = fetch_capital_replacement_rates(
-                    lifetime, data_full.sel(region=region, year=avg_start)
-                )
-
-                # subtract the capital replacement (which is negative) rate
-                # to the changes market share
-                market_shares.loc[{"region": region}] -= cap_repl_rate[:, None]
-
-            if (not capital_repl_rate and volume_change < 0) or (
-                capital_repl_rate and volume_change < avg_cap_repl_rate
-            ):
-                # we remove suppliers with a positive growth
-                market_shares.loc[{"region": region}].values[
-                    market_shares.loc[{"region": region}].values >= 0
-                ] = 0
-                # we keep suppliers with a negative growth
-                # we use negative 1 so that in the next step they are still seen as negative
-                market_shares.loc[{"region": region}].values[
-                    market_shares.loc[{"region": region}].values < 0
-                ] = -1
-                # and use their production volume as their indicator
-                market_shares.loc[{"region": region}] *= data_start.values[:, None]
+        marginal_shares = np.where(
+            decreasing[:, None],
+            # we remove suppliers with a positive growth
+            # we keep suppliers with a negative growth
+            # we use negative 1 so that in the next step they are still seen as negative
+            np.where(marginal_shares < 0, -1.0, 0.0),
             # increasing market or
             # market decreasing slower than the
-            # capital renewal rate
-            else:
-                # we remove suppliers with a negative growth
-                market_shares.loc[{"region": region}].values[
-                    market_shares.loc[{"region": region}].values <= 0
-                ] = 0
-                # we keep suppliers with a positive growth
-                market_shares.loc[{"region": region}].values[
-                    market_shares.loc[{"region": region}].values > 0
-                ] = 1
-                # and use their production volume as their indicator
-                market_shares.loc[{"region": region}] *= data_start.values[:, None]
-
-        market_shares.loc[{"region": region}] = market_shares.loc[
-            {"region": region}
-        ].round(3)
-
-        # we remove NaNs and np.inf
-        market_shares.loc[{"region": region}].values[
-            market_shares.loc[{"region": region}].values == np.inf
-        ] = 0
-        market_shares.loc[{"region": region}] = market_shares.loc[
-            {"region": region}
-        ].fillna(0)
-
-        summary.append(
-            (
-                region,
-                measurement,
-                foresight,
-                duration,
-                avg_start,
-                avg_end,
-                np.round(avg_cap_repl_rate, 2),
-                np.round(volume_change, 2),
-            )
+            # capital renewal rate:
+            # we remove suppliers with a negative growth
+            # we keep suppliers with a positive growth
+            np.where(marginal_shares > 0, 1.0, 0.0),
         )
+        # and use their production volume as their indicator
+        marginal_shares *= data_start
 
-        # market decreasing faster than the average capital renewal rate
-        # in this case, the idea is that oldest/non-competitive technologies
-        # are likely to supply by increasing their lifetime
-        # as the market does not justify additional capacity installation
-        if (not capital_repl_rate and volume_change < 0) or (
-            capital_repl_rate and volume_change < avg_cap_repl_rate
-        ):
-            # we remove suppliers with a positive growth
-            market_shares.loc[{"region": region}].values[
-                market_shares.loc[{"region": region}].values > 0
-            ] = 0
-            # we reverse the sign of negative growth suppliers
-            market_shares.loc[{"region": region}] *= -1
-            market_shares.loc[{"region": region}] /= market_shares.loc[
-                {"region": region}
-            ].sum(dim="variables")
-
-        # increasing market or
-        # market decreasing slowlier than the
-        # capital renewal rate
-        else:
-            # we remove suppliers with a negative growth
-            market_shares.loc[{"region": region}].values[
-                market_shares.loc[{"region": region}].values < 0
-            ] = 0
-            market_shares.loc[{"region": region}] /= market_shares.loc[
-                {"region": region}
-            ].sum(dim="variables")
+    marginal_shares = normalize_marginal_shares(marginal_shares, decreasing)
 
     # print a summary of the results
     print()
@@ -823,4 +783,4 @@ def consequential_method(
     table.hrules = ALL
     print(table)
 
-    return market_shares
+    return build_market_shares(data, year, marginal_shares)
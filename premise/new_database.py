@@ -9,6 +9,7 @@ import logging
 import multiprocessing
 import os
 import pickle
+from contextlib import nullcontext
 from datetime import date
 from multiprocessing import Pool as ProcessPool
 from multiprocessing.pool import ThreadPool as Pool
@@ -875,8 +876,21 @@ class NewDatabase:
             [item for item in sectors if item not in sector_update_methods]
         )
 
+        # a single pool of workers is started for all sectors,
+        # with no more workers than there are scenarios
+        pool_context = (
+            ProcessPool(
+                processes=max(1, min(len(self.scenarios), multiprocessing.cpu_count()))
+            )
+            if self.multiprocessing
+            else nullcontext()
+        )
+
         # Outer tqdm progress bar for sectors
-        with tqdm(total=len(sectors), desc="Updating sectors", ncols=70) as pbar_outer:
+        with (
+            pool_context as pool,
+            tqdm(total=len(sectors), desc="Updating sectors", ncols=70) as pbar_outer,
+        ):
             for sector in sectors:
                 pbar_outer.set_description(f"Updating: {sector}")
                 if sector == "external" and self.datapackages is None:
@@ -892,18 +906,15 @@ class NewDatabase:
                 if self.multiprocessing:
 
                     # Process scenarios in parallel for the current sector
-                    with ProcessPool(processes=multiprocessing.cpu_count()) as pool:
-                        # Prepare the tasks with all necessary arguments
-                        tasks = [
-                            (scenario,) + fixed_args for scenario in self.scenarios
-                        ]
-
-                        # Use starmap for preserving the order of tasks
-                        results = pool.starmap(update_func, tasks)
-
-                        # Update self.scenarios based on the ordered results
-                        for s, updated_scenario in enumerate(results):
-                            self.scenarios[s] = updated_scenario
+                    # Prepare the tasks with all necessary arguments
+                    tasks = [(scenario,) + fixed_args for scenario in self.scenarios]
+
+                    # Use starmap for preserving the order of tasks
+                    results = pool.starmap(update_func, tasks)
+
+                    # Update self.scenarios based on the ordered results
+                    for s, updated_scenario in enumerate(results):
+                        self.scenarios[s] = updated_scenario
 
                 else:
                     # Process scenarios in sequence for the current sector
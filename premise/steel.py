@@ -431,23 +431,35 @@ class Steel(BaseTransformation):
             "steam",
         ]
 
-        for region, dataset in datasets.items():
-            # Determine the sector based on the activity name
-            if any(i in dataset["name"] for i in ["converter", "pig iron"]):
-                sector = "steel - primary"
-            else:
-                sector = "steel - secondary"
+        # Determine the sector based on the activity name
+        sectors = {
+            region: (
+                "steel - primary"
+                if any(i in dataset["name"] for i in ["converter", "pig iron"])
+                else "steel - secondary"
+            )
+            for region, dataset in datasets.items()
+        }
 
+        # Calculate the scaling factor based on the efficiency change from 2020 to the current year,
+        # looking up the efficiency changes of all the datasets of a sector at once
+        scaling_factors = {}
+        for sector in set(sectors.values()):
             if sector in self.iam_data.steel_efficiencies.variables.values:
-                # Calculate the scaling factor based on the efficiency change from 2020 to the current year
-                scaling_factor = 1 / self.find_iam_efficiency_change(
+                regions = [region for region, s in sectors.items() if s == sector]
+                efficiency_changes = self.find_iam_efficiency_changes(
                     data=self.iam_data.steel_efficiencies,
                     variable=sector,
-                    location=dataset["location"],
+                    locations=[datasets[region]["location"] for region in regions],
+                )
+                scaling_factors.update(
+                    (region, 1 / change)
+                    for region, change in zip(regions, efficiency_changes.tolist())
                 )
 
-            else:
-                scaling_factor = 1
+        for region, dataset in datasets.items():
+            sector = sectors[region]
+            scaling_factor = scaling_factors.get(region, 1)
 
             if scaling_factor != 1 and scaling_factor > 0:
                 # when sector is steel - secondary, we want to make sure
@@ -8,13 +8,12 @@ on the wurst database.
 import copy
 import logging.config
 import uuid
-from collections import defaultdict
+from collections import Counter, defaultdict
 from collections.abc import ValuesView
-from copy import deepcopy
 from functools import lru_cache
-from itertools import groupby, product
+from itertools import product
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
 
 import numpy as np
 import xarray as xr
@@ -46,6 +45,19 @@ with open(LOG_CONFIG, encoding="utf-8") as f:
 logger = logging.getLogger("module")
 
 
+def equals_any(field: str, values) -> Callable[[dict], bool]:
+    """
+    Return a filter function where input ``field`` value is one of ``values``.
+    It matches the same datasets as ``ws.either`` over ``ws.equals`` filters,
+    with a single set lookup rather than one comparison per value.
+    :param field: field to look at (e.g., "name", "location")
+    :param values: values to look for
+    :return: filter function
+    """
+    values = set(values)
+    return lambda x: x.get(field) in values
+
+
 def get_suppliers_of_a_region(
     database: List[dict],
     locations: List[str],
@@ -71,7 +83,7 @@ def get_suppliers_of_a_region(
 
     if exact_match:
         filters = [
-            ws.either(*[ws.equals("name", supplier) for supplier in names]),
+            equals_any("name", names),
         ]
     else:
         filters = [
@@ -79,7 +91,7 @@ def get_suppliers_of_a_region(
         ]
 
     filters += [
-        ws.either(*[ws.equals("location", loc) for loc in locations]),
+        equals_any("location", locations),
         ws.contains("reference product", reference_prod),
         ws.equals("unit", unit),
     ]
@@ -93,6 +105,48 @@ def get_suppliers_of_a_region(
     )
 
 
+@lru_cache
+def get_geomap(model: str) -> Geomap:
+    """
+    Return the Geomap of an IAM model.
+    Geomaps are only read from, and are shared between transformations.
+    :param model: IAM model (e.g., "remind", "image")
+    :return: Geomap of the model
+    """
+    return Geomap(model=model)
+
+
+@lru_cache(maxsize=None)
+def get_ecoinvent_to_iam_location(model: str, location: str) -> str:
+    """
+    Return the IAM region of an ecoinvent location.
+    :param model: IAM model (e.g., "remind", "image")
+    :param location: ecoinvent location
+    :return: IAM region name
+    """
+    return get_geomap(model).ecoinvent_to_iam_location(location)
+
+
+def get_production_volume(act: Dict[str, Any]) -> float:
+    """
+    Return the production volume of a dataset.
+    :param act: dataset
+    :return: production volume, with a minimum value of 1e-9
+    """
+
+    if "production volume" in act:
+        return max(float(act["production volume"]), 1e-9)
+
+    production_volume = 0
+    for exc in act["exchanges"]:
+        if exc["type"] == "production":
+            # even if non-existent, we set a minimum value of 1e-9
+            # because if not, we risk dividing by zero!!!
+            production_volume = max(float(exc.get("production volume", 1e-9)), 1e-9)
+
+    return production_volume
+
+
 def get_shares_from_production_volume(
     ds_list: Union[Dict[str, Any], List[Dict[str, Any]]],
 ) -> Dict[Tuple[Any, Any, Any, Any], float]:
@@ -106,37 +160,45 @@ def get_shares_from_production_volume(
     if not isinstance(ds_list, list):
         ds_list = [ds_list]
 
-    dict_act = {}
-    total_production_volume = 0
+    production_volumes = np.fromiter(
+        map(get_production_volume, ds_list), dtype=float, count=len(ds_list)
+    )
+    total_production_volume = production_volumes.sum()
 
-    for act in ds_list:
-        production_volume = 0
+    if total_production_volume != 0:
+        production_volumes /= total_production_volume
 
-        if "production volume" in act:
-            production_volume = max(float(act["production volume"]), 1e-9)
-        else:
-            for exc in ws.production(act):
-                # even if non-existent, we set a minimum value of 1e-9
-                # because if not, we risk dividing by zero!!!
-                production_volume = max(float(exc.get("production volume", 1e-9)), 1e-9)
-
-        dict_act[
+    return dict(
+        zip(
             (
-                act["name"],
-                act["location"],
-                act["reference product"],
-                act["unit"],
-            )
-        ] = production_volume
-        total_production_volume += production_volume
+                (act["name"], act["location"], act["reference product"], act["unit"])
+                for act in ds_list
+            ),
+            production_volumes.tolist(),
+        )
+    )
 
-    def nonzero(x):
-        return x if x != 0.0 else 1.0
 
-    for dataset in dict_act:
-        dict_act[dataset] /= nonzero(total_production_volume)
+def copy_dataset(dataset: dict) -> dict:
+    """
+    Return a copy of a dataset, in which the exchanges and the containers
+    of the dataset and of its exchanges (e.g., `parameters`) are copied,
+    but not their contents, which are strings, numbers or tuples.
+    This is much cheaper than a deep copy of the full dataset.
+    :param dataset: dataset to copy
+    :return: copy of the dataset
+    """
 
-    return dict_act
+    def copy_fields(item: dict) -> dict:
+        return {
+            key: copy.copy(value) if isinstance(value, (dict, list, set)) else value
+            for key, value in item.items()
+        }
+
+    new_dataset = copy_fields(dataset)
+    new_dataset["exchanges"] = [copy_fields(exc) for exc in dataset["exchanges"]]
+
+    return new_dataset
 
 
 def get_tuples_from_database(database: List[dict]) -> List[Tuple[str, str, str]]:
@@ -146,8 +208,10 @@ def get_tuples_from_database(database: List[dict]) -> List[Tuple[str, str, str]]
     :param database: wurst database
     :return: a list of tuples
     """
+    get_tuple = itemgetter("name", "reference product", "location")
+
     return [
-        (dataset["name"], dataset["reference product"], dataset["location"])
+        get_tuple(dataset)
         for dataset in database
         if "has_downstream_consumer" not in dataset
     ]
@@ -179,8 +243,9 @@ def remove_exchanges(datasets_dict: Dict[str, dict], list_exc: List) -> Dict[str
 
 
 def new_exchange(exc, location, factor):
-    copied_exc = deepcopy(exc)
-    copied_exc["location"] = location
+    # a shallow copy is enough: the location is replaced
+    # and `rescale_exchange` only reassigns top-level fields
+    copied_exc = {**exc, "location": location}
     return rescale_exchange(copied_exc, factor, remove_uncertainty=False)
 
 
@@ -203,13 +268,13 @@ def allocate_inputs(exc, lst):
     if lst[0]["name"] != exc["name"]:
         exc["name"] = lst[0]["name"]
 
+    # shares are computed once, and used both
+    # to rescale the new exchanges and as cache entries
+    allocation = [(obj, factor / total) for obj, factor in zip(lst, pvs) if factor > 0]
+
     return (
-        [
-            new_exchange(exc, obj["location"], factor / total)
-            for obj, factor in zip(lst, pvs)
-            if factor > 0
-        ],
-        [p / total for p in pvs if p > 0],
+        [new_exchange(exc, obj["location"], share) for obj, share in allocation],
+        [share for _, share in allocation],
     )
 
 
@@ -250,7 +315,7 @@ class BaseTransformation:
         self.iam_data: IAMDataCollection = iam_data
         self.model: str = model
         self.regions: List[str] = iam_data.regions
-        self.geo: Geomap = Geomap(model=model)
+        self.geo: Geomap = get_geomap(model)
         self.scenario: str = pathway
         self.year: int = year
         self.version: str = version
@@ -261,6 +326,7 @@ class BaseTransformation:
         self.heat_techs = mapping.generate_heat_map()
         self.system_model: str = system_model
         self.cache: dict = cache or {}
+        self.gis_match_cache: dict = {}
 
         # reverse the fuel map to get a mapping from ecoinvent to premise
         self.fuel_map_reverse: Dict = {}
@@ -271,15 +337,17 @@ class BaseTransformation:
 
         self.material_map: Dict[str, Set] = mapping.generate_material_map()
         self.ecoinvent_to_iam_loc: Dict[str, str] = {
-            loc: self.geo.ecoinvent_to_iam_location(loc)
+            loc: get_ecoinvent_to_iam_location(model, loc)
             for loc in self.get_ecoinvent_locs()
         }
         self.index = index or self.create_index()
+        # ids of the indexed datasets per key, to find duplicates without a scan
+        self.index_ids: Dict[Tuple[str, str], Set[int]] = {}
 
     def create_index(self):
         idx = defaultdict(list)
         for ds in self.database:
-            key = (copy.deepcopy(ds["name"]), copy.deepcopy(ds["reference product"]))
+            key = (ds["name"], ds["reference product"])
             idx[key].append(ds)
         return idx
 
@@ -291,17 +359,54 @@ class BaseTransformation:
             ds = [ds]
 
         for d in ds:
-            key = (copy.deepcopy(d["name"]), copy.deepcopy(d["reference product"]))
-            self.index[key].append(d)
+            key = (d["name"], d["reference product"])
+            # datasets re-indexed after being modified are only listed once
+            ids = self.index_ids.get(key)
+            if ids is None:
+                ids = self.index_ids[key] = {id(x) for x in self.index[key]}
+            if id(d) not in ids:
+                ids.add(id(d))
+                self.index[key].append(d)
 
     def remove_from_index(self, ds):
-        key = (copy.deepcopy(ds["name"]), copy.deepcopy(ds["reference product"]))
-        available_locations = [k["location"] for k in self.index[key]]
-        if ds["location"] in available_locations:
-            ds_to_remove = [
-                d for d in self.index[key] if d["location"] == ds["location"]
-            ][0]
-            self.index[key].remove(ds_to_remove)
+        self.remove_many_from_index([ds])
+
+    def remove_many_from_index(self, datasets):
+        # the locations to remove are counted per key, so that
+        # each index entry is visited once, whatever the number of datasets
+        to_remove = defaultdict(Counter)
+        for ds in datasets:
+            to_remove[(ds["name"], ds["reference product"])][ds["location"]] += 1
+
+        for key, locations in to_remove.items():
+            kept = []
+            for d in self.index[key]:
+                if locations[d["location"]] > 0:
+                    locations[d["location"]] -= 1
+                else:
+                    kept.append(d)
+            self.index[key][:] = kept
+            self.index_ids.pop(key, None)
+
+    def get_from_index(self, name: str, product: str, location: str) -> dict:
+        """
+        Return the first indexed dataset with the given name, reference product
+        and location. Entries of datasets renamed since they were indexed
+        are skipped.
+        :param name: dataset name
+        :param product: dataset reference product
+        :param location: dataset location
+        :return: dataset
+        """
+        for ds in self.index.get((name, product), ()):
+            if (ds["name"], ds["reference product"], ds["location"]) == (
+                name,
+                product,
+                location,
+            ):
+                return ds
+
+        raise ws.NoResults(f"Can't find {name} {product} {location} in the database")
 
     def is_in_index(self, ds, location=None):
         if not any(key in ds for key in ["reference product", "product"]):
@@ -314,9 +419,9 @@ class BaseTransformation:
             key = (ds["name"], ds["product"])
 
         if location is None:
-            return ds["location"] in [k["location"] for k in self.index[key]]
+            location = ds["location"]
 
-        return location in [k["location"] for k in self.index[key]]
+        return any(k["location"] == location for k in self.index.get(key, ()))
 
     @lru_cache
     def select_multiple_suppliers(
@@ -346,7 +451,16 @@ class BaseTransformation:
             "RER",
         ]
 
-        suppliers, counter = [], 0
+        # filters are built once, outside the search loop
+        name_filter = ws.either(*[ws.contains("name", sup) for sup in possible_names])
+        location_filters = [
+            (
+                equals_any("location", loc)
+                if isinstance(loc, list)
+                else ws.equals("location", loc)
+            )
+            for loc in possible_locations
+        ]
 
         extra_filters = []
         if look_for:
@@ -372,44 +486,29 @@ class BaseTransformation:
                 )
             )
 
-        try:
-            while not suppliers:
-                suppliers = list(
-                    ws.get_many(
-                        self.database,
-                        ws.either(
-                            *[ws.contains("name", sup) for sup in possible_names]
-                        ),
-                        (
-                            ws.either(
-                                *[
-                                    ws.equals("location", item)
-                                    for item in possible_locations[counter]
-                                ]
-                            )
-                            if isinstance(possible_locations[counter], list)
-                            else ws.equals("location", possible_locations[counter])
-                        ),
-                        *extra_filters,
-                    )
-                )
-                counter += 1
-        except IndexError as err:
-
-            suppliers = list(
-                ws.get_many(
-                    self.database,
-                    ws.either(*[ws.contains("name", sup) for sup in possible_names]),
-                    *extra_filters,
-                )
+        # the database is scanned once, and suppliers are then
+        # picked by order of preference of their location
+        candidates = list(
+            ws.get_many(
+                self.database,
+                name_filter,
+                *extra_filters,
             )
+        )
+
+        for location_filter in location_filters:
+            suppliers = list(ws.get_many(candidates, location_filter))
+            if suppliers:
+                break
+        else:
+            suppliers = candidates
 
             if not suppliers:
                 raise IndexError(
                     f"No supplier found for {possible_names} in {possible_locations}, "
                     f"looking for terms: {look_for} "
                     f"and with blacklist: {blacklist}"
-                ) from err
+                )
 
         suppliers = get_shares_from_production_volume(suppliers)
 
@@ -423,41 +522,14 @@ class BaseTransformation:
         :rtype: list
         """
 
-        locs = list(set(a["location"] for a in self.database))
-
-        # add Laos
-        if "LA" not in locs:
-            locs.append("LA")
-
-        # add Fiji
-        if "FJ" not in locs:
-            locs.append("FJ")
-
-        # add Guinea
-        if "GN" not in locs:
-            locs.append("GN")
-
-        # add Guyana
-        if "GY" not in locs:
-            locs.append("GY")
-
-        # add Sierra Leone
-        if "SL" not in locs:
-            locs.append("SL")
+        # unique locations, in order of appearance
+        locs = dict.fromkeys(a["location"] for a in self.database)
 
-        # add Solomon Islands
-        if "SB" not in locs:
-            locs.append("SB")
+        # add Laos, Fiji, Guinea, Guyana, Sierra Leone,
+        # Solomon Islands, Uganda and Afghanistan
+        locs.update(dict.fromkeys(["LA", "FJ", "GN", "GY", "SL", "SB", "UG", "AF"]))
 
-        # add Uganda
-        if "UG" not in locs:
-            locs.append("UG")
-
-        # add Afghanistan
-        if "AF" not in locs:
-            locs.append("AF")
-
-        return locs
+        return list(locs)
 
     def update_ecoinvent_efficiency_parameter(
         self, dataset: dict, old_ei_eff: float, new_eff: float
@@ -605,16 +677,21 @@ class BaseTransformation:
         }
 
     def region_to_proxy_dataset_mapping(
-        self, name: str, ref_prod: str, regions: List[str] = None
+        self,
+        name: str,
+        ref_prod: str,
+        regions: List[str] = None,
+        datasets: List[dict] = None,
     ) -> Dict[str, str]:
+        iam_regions = set(self.regions)
         d_map = {
             self.ecoinvent_to_iam_loc[d["location"]]: d["location"]
             for d in ws.get_many(
-                self.database,
+                self.database if datasets is None else datasets,
                 ws.equals("name", name),
                 ws.contains("reference product", ref_prod),
             )
-            if d["location"] not in self.regions
+            if d["location"] not in iam_regions
         }
 
         if not regions:
@@ -665,40 +742,79 @@ class BaseTransformation:
         :return: dictionary with IAM regions as keys, proxy datasets as values.
         """
 
-        d_iam_to_eco = geo_mapping or self.region_to_proxy_dataset_mapping(
-            name=name, ref_prod=ref_prod, regions=regions
-        )
-
         d_act = {}
 
         ds_name, ds_ref_prod = [None, None]
 
-        for region in d_iam_to_eco:
-            # build filters
-            if exact_name_match is True:
-                filters = [
-                    ws.equals("name", name),
-                ]
-            else:
-                filters = [
-                    ws.contains("name", name),
-                ]
-            if exact_product_match is True:
-                filters.append(ws.equals("reference product", ref_prod))
-            else:
-                filters.append(ws.contains("reference product", ref_prod))
+        # build filters
+        if exact_name_match is True:
+            filters = [
+                ws.equals("name", name),
+            ]
+        else:
+            filters = [
+                ws.contains("name", name),
+            ]
+        if exact_product_match is True:
+            filters.append(ws.equals("reference product", ref_prod))
+        else:
+            filters.append(ws.contains("reference product", ref_prod))
 
-            filters.append(ws.equals("location", d_iam_to_eco[region]))
+        # the type of `production_variable` is checked once for all regions
+        if isinstance(production_variable, str):
+            production_variable = [
+                production_variable,
+            ]
+
+        use_iam_production_volumes = isinstance(production_variable, list) and all(
+            i in self.iam_data.production_volumes.variables for i in production_variable
+        )
+
+        # the database is scanned once for all regions,
+        # and the datasets are then picked by location
+        candidates = list(ws.get_many(self.database, *filters))
+
+        # the candidates are also used to map regions to proxy datasets,
+        # unless they were searched with different filters
+        d_iam_to_eco = geo_mapping or self.region_to_proxy_dataset_mapping(
+            name=name,
+            ref_prod=ref_prod,
+            regions=regions,
+            datasets=(
+                candidates
+                if exact_name_match is True and exact_product_match is not True
+                else None
+            ),
+        )
+
+        # production volumes are interpolated once for all regions
+        prod_vols = {}
+        if use_iam_production_volumes:
+            iam_regions = set(self.iam_data.production_volumes.region.values)
+            volumes = (
+                self.iam_data.production_volumes.sel(
+                    region=[r for r in d_iam_to_eco if r in iam_regions],
+                    variables=production_variable,
+                )
+                .interp(year=self.year)
+                .sum(dim="variables")
+            )
+            prod_vols = dict(
+                zip(volumes.region.values.tolist(), volumes.values.tolist())
+            )
+
+        for region in d_iam_to_eco:
+            location_filter = ws.equals("location", d_iam_to_eco[region])
 
             try:
                 dataset = ws.get_one(
-                    self.database,
-                    *filters,
+                    candidates,
+                    location_filter,
                 )
             except ws.MultipleResults as err:
                 results = ws.get_many(
-                    self.database,
-                    *filters,
+                    candidates,
+                    location_filter,
                 )
                 raise ws.MultipleResults(
                     err,
@@ -707,7 +823,7 @@ class BaseTransformation:
                 )
 
             if not self.is_in_index(dataset, region):
-                d_act[region] = copy.deepcopy(dataset)
+                d_act[region] = copy_dataset(dataset)
                 d_act[region]["location"] = region
                 d_act[region]["code"] = str(uuid.uuid4().hex)
 
@@ -720,33 +836,11 @@ class BaseTransformation:
                 if "input" in d_act[region]:
                     del d_act[region]["input"]
 
-                if production_variable is not None:
-                    # Add `production volume` field
-                    if isinstance(production_variable, str):
-                        production_variable = [
-                            production_variable,
-                        ]
-
-                    if isinstance(production_variable, list):
-                        if all(
-                            i in self.iam_data.production_volumes.variables
-                            for i in production_variable
-                        ):
-                            prod_vol = (
-                                self.iam_data.production_volumes.sel(
-                                    region=region, variables=production_variable
-                                )
-                                .interp(year=self.year)
-                                .sum(dim="variables")
-                                .values.item(0)
-                            )
-                        else:
-                            prod_vol = 1
-
-                    elif isinstance(production_variable, dict):
-                        prod_vol = production_variable[region]
-                    else:
-                        prod_vol = 1
+                # Add `production volume` field
+                if use_iam_production_volumes:
+                    prod_vol = prod_vols[region]
+                elif isinstance(production_variable, dict):
+                    prod_vol = production_variable[region]
                 else:
                     prod_vol = 1
 
@@ -761,12 +855,13 @@ class BaseTransformation:
                 ds_ref_prod = d_act[region]["reference product"]
 
         # add dataset to emptied datasets list
-        for ds in ws.get_many(
-            self.database,
-            ws.equals("name", ds_name),
-            ws.equals("reference product", ds_ref_prod),
-        ):
-            self.remove_from_index(ds)
+        self.remove_many_from_index(
+            ws.get_many(
+                self.database,
+                ws.equals("name", ds_name),
+                ws.equals("reference product", ds_ref_prod),
+            )
+        )
 
         # empty original datasets
         # and make them link to new regional datasets
@@ -816,15 +911,18 @@ class BaseTransformation:
         if loc_map:
             mapping = defaultdict(set)
             for v in loc_map.values():
-                if self.geo.ecoinvent_to_iam_location(v) in loc_map.keys():
-                    mapping[v].add(self.geo.ecoinvent_to_iam_location(v))
+                iam_location = get_ecoinvent_to_iam_location(self.model, v)
+                if iam_location in loc_map:
+                    mapping[v].add(iam_location)
+
+        # IAM regions are excluded with a single set lookup per dataset,
+        # rather than with one location filter per region
+        iam_regions = set(self.regions)
         existing_datasets = ws.get_many(
             self.database,
             ws.equals("name", name),
             ws.equals("reference product", ref_prod),
-            ws.exclude(
-                ws.either(*[ws.equals("location", loc) for loc in self.regions])
-            ),
+            lambda x: x["location"] not in iam_regions,
         )
 
         for existing_ds in existing_datasets:
@@ -878,22 +976,18 @@ class BaseTransformation:
                 i in self.iam_data.production_volumes.variables.values.tolist()
                 for i in production_variable
             ):
-                for location in locations:
-                    share = (
-                        self.iam_data.production_volumes.sel(
-                            region=location, variables=production_variable
-                        )
-                        .interp(year=self.year)
-                        .sum(dim="variables")
-                        .values.item(0)
-                    ) / _(
-                        self.iam_data.production_volumes.sel(
-                            region=locations, variables=production_variable
-                        )
-                        .interp(year=self.year)
-                        .sum(dim=["variables", "region"])
-                        .values.item(0)
+                # production volumes of all locations are interpolated at once
+                volumes = (
+                    self.iam_data.production_volumes.sel(
+                        region=locations, variables=production_variable
                     )
+                    .interp(year=self.year)
+                    .sum(dim="variables")
+                )
+                total_volume = _(volumes.sum().values.item(0))
+
+                for location, volume in zip(locations, volumes.values.tolist()):
+                    share = volume / total_volume
 
                     if share > 0:
                         existing_ds["exchanges"].append(
@@ -975,25 +1069,28 @@ class BaseTransformation:
 
             # make a dictionary with the names and amounts
             # of the technosphere exchanges to relink
-            # to compare with the new exchanges
+            # to compare with the new exchanges, and sum the amounts
+            # of unique exchanges to relink, in order of appearance,
+            # in a single pass
+            get_key = itemgetter("name", "product", "location", "unit")
             excs_to_relink_dict = defaultdict(float)
+            unique_amounts = {}
             for exc in excs_to_relink:
                 excs_to_relink_dict[exc["product"]] += exc["amount"]
+                key = get_key(exc)
+                unique_amounts[key] = unique_amounts.get(key, 0) + exc["amount"]
 
-            # Create a set of unique exchanges to relink
-            # turn this into a list of dictionaries
+            # Create a list of unique exchanges to relink,
+            # as a list of dictionaries
             unique_excs_to_relink = [
                 {
-                    "name": exc["name"],
-                    "product": exc["product"],
-                    "location": exc["location"],
-                    "unit": exc["unit"],
+                    "name": name,
+                    "product": product,
+                    "location": location,
+                    "unit": unit,
+                    "amount": amount,
                 }
-                for exc in excs_to_relink
-            ]
-            # remove duplicates items in the list
-            unique_excs_to_relink = [
-                dict(t) for t in {tuple(d.items()) for d in unique_excs_to_relink}
+                for (name, product, location, unit), amount in unique_amounts.items()
             ]
 
             # Process exchanges to relink
@@ -1001,8 +1098,12 @@ class BaseTransformation:
                 act, unique_excs_to_relink, alt_names
             )
 
-            # Update act["exchanges"] by removing the exchanges to relink
-            act["exchanges"] = [e for e in act["exchanges"] if e not in excs_to_relink]
+            # Update act["exchanges"] by removing the exchanges to relink,
+            # which are identified by identity rather than compared
+            ids_to_relink = {id(e) for e in excs_to_relink}
+            act["exchanges"] = [
+                e for e in act["exchanges"] if id(e) not in ids_to_relink
+            ]
             # Update act["exchanges"] by adding new exchanges
             act["exchanges"].extend(new_exchanges)
 
@@ -1026,23 +1127,25 @@ class BaseTransformation:
                 )
 
     def process_exchanges_to_relink(self, act, unique_excs_to_relink, alt_names):
-        new_exchanges = []
+        rows = []
         for exc in unique_excs_to_relink:
             entries, amount = self.find_new_exchange_entries(act, exc, alt_names)
             if amount != 0:
-                new_exchanges.extend(self.create_new_exchanges(entries, amount))
+                rows.extend(self.create_new_exchanges(entries, amount))
         # Make exchanges unique and sum amounts for duplicates
-        return self.summarize_exchanges(new_exchanges)
+        return self.summarize_exchanges([], rows)
 
     def get_exchange_from_cache(self, exc, loc):
         key = (
+            loc,
+            self.model,
             exc["name"],
             exc["product"],
             exc["location"],
             exc["unit"],
         )
 
-        return self.cache.get(loc, {}).get(self.model, {}).get(key)
+        return self.cache.get(key)
 
     def find_alternative_locations(self, act, exc, alt_names):
         """
@@ -1065,18 +1168,9 @@ class BaseTransformation:
 
             pvs = []
             for o in lst:
-                try:
-                    ds = ws.get_one(
-                        self.database,
-                        ws.equals("name", o[0]),
-                        ws.equals("reference product", o[1]),
-                        ws.equals("location", o[2]),
-                    )
-
-                except ws.NoResults:
-                    raise ws.NoResults(
-                        f"Can't find {o[0]} {o[1]} {o[2]} in the database"
-                    )
+                # candidates are looked up in the index
+                # rather than by scanning the database
+                ds = self.get_from_index(o[0], o[1], o[2])
 
                 for exc in ds["exchanges"]:
                     if exc["type"] == "production":
@@ -1095,18 +1189,17 @@ class BaseTransformation:
         # Function to search for new exchanges
         def search_for_new_exchanges(names):
             entries = []
-            for name_to_look_for, alt_loc in product(
-                set(names), set(alternative_locations)
-            ):
+            names = set(names)
+            # the locations available for each name are read once from the index
+            available_locations = {
+                name: {
+                    d["location"] for d in self.index.get((name, exc["product"]), ())
+                }
+                for name in names
+            }
+            for name_to_look_for, alt_loc in product(names, set(alternative_locations)):
                 if (name_to_look_for, alt_loc) != (act["name"], act["location"]):
-                    if self.is_in_index(
-                        {
-                            "name": name_to_look_for,
-                            "product": exc["product"],
-                            "location": alt_loc,
-                            "unit": exc["unit"],
-                        }
-                    ):
+                    if alt_loc in available_locations[name_to_look_for]:
                         entries.append(
                             (
                                 name_to_look_for,
@@ -1176,10 +1269,7 @@ class BaseTransformation:
         return search_for_new_exchanges(names_to_look_for)
 
     def find_new_exchange_entries(self, act, exc, alt_names):
-        entries = None
-
-        if self.is_exchange_in_cache(exc, act["location"]):
-            entries = self.get_exchange_from_cache(exc, act["location"])
+        entries = self.get_exchange_from_cache(exc, act["location"])
 
         if not entries:
             entries = self.find_alternative_locations(act, exc, alt_names)
@@ -1189,35 +1279,29 @@ class BaseTransformation:
                 (exc["name"], exc["product"], exc["location"], exc["unit"]) + (1.0,)
             ]
 
-        amount = sum(
-            e["amount"]
-            for e in ws.technosphere(act)
-            if (e["name"], e["product"], e["location"], e["unit"])
-            == (exc["name"], exc["product"], exc["location"], exc["unit"])
-        )
-
-        return entries, amount
+        # the amount of the exchange is the sum of the amounts
+        # of all the exchanges it stands for
+        return entries, exc["amount"]
 
     def create_new_exchanges(self, entries, amount):
+        # entries are (name, product, location, unit, share) tuples,
+        # and new exchanges are returned as (name, product, location, unit, amount)
+        # rows, turned into exchanges once summarized
         return [
-            {
-                "name": e[0],
-                "product": e[1],
-                "amount": amount * e[-1],
-                "type": "technosphere",
-                "unit": e[3],
-                "location": e[2],
-            }
-            for e in entries
+            (name, product, location, unit, amount * share)
+            for name, product, location, unit, share in entries
         ]
 
-    def summarize_exchanges(self, new_exchanges):
-        grouped_exchanges = groupby(
-            sorted(
-                new_exchanges, key=itemgetter("name", "product", "location", "unit")
-            ),
-            key=itemgetter("name", "product", "location", "unit"),
-        )
+    def summarize_exchanges(self, new_exchanges, rows=()):
+        # sum the amounts of exchanges and of (name, product, location, unit, amount)
+        # rows with the same name, product, location and unit in a single pass
+        get_key = itemgetter("name", "product", "location", "unit")
+        amounts = defaultdict(float)
+        for exc in new_exchanges:
+            amounts[get_key(exc)] += exc["amount"]
+        for name, prod, loc, unit, amount in rows:
+            amounts[(name, prod, loc, unit)] += amount
+
         return [
             {
                 "name": name,
@@ -1225,9 +1309,9 @@ class BaseTransformation:
                 "location": loc,
                 "unit": unit,
                 "type": "technosphere",
-                "amount": sum(e["amount"] for e in excs),
+                "amount": amount,
             }
-            for (name, prod, loc, unit), excs in grouped_exchanges
+            for (name, prod, loc, unit), amount in sorted(amounts.items())
         ]
 
     def get_carbon_capture_rate(self, loc: str, sector: str) -> float:
@@ -1368,16 +1452,40 @@ class BaseTransformation:
         :return: relative efficiency change (e.g., 1.05)
         """
 
-        scaling_factor = (
-            data.sel(region=location, variables=variable)
-            .interp(year=self.year)
-            .values.item(0)
+        return self.find_iam_efficiency_changes(data, variable, [location]).item(0)
+
+    def find_iam_efficiency_changes(
+        self,
+        data: xr.DataArray,
+        variable: Union[str, list],
+        locations: List[str],
+    ) -> np.ndarray:
+        """
+        Return the relative change in efficiency for `variable` in each of `locations`
+        relative to 2020, with a single selection and interpolation of `data`.
+        :param variable: IAM variable name
+        :param locations: IAM regions
+        :return: relative efficiency changes, in the order of `locations`
+        """
+
+        if not locations:
+            return np.array([])
+
+        data = data.sel(region=locations, variables=variable).transpose(
+            "region", ..., "year"
         )
+        # the first series of each region is interpolated,
+        # as a single region selection would be
+        series = data.values.reshape(len(locations), -1, data.year.size)[:, 0]
 
-        if scaling_factor in (np.nan, np.inf):
-            scaling_factor = 1
+        scaling_factors = np.array(
+            [
+                np.interp(self.year, data.year.values, s, left=np.nan, right=np.nan)
+                for s in series
+            ]
+        )
 
-        return scaling_factor
+        return np.where(scaling_factors == np.inf, 1, scaling_factors)
 
     def write_log(self, dataset, status="created"):
         """
@@ -1408,6 +1516,8 @@ class BaseTransformation:
 
         # Create a key for the cache entry.
         exc_key = (
+            location,
+            self.model,
             exchange["name"],
             exchange["product"],
             exchange["location"],
@@ -1426,12 +1536,8 @@ class BaseTransformation:
             for e, s in zip(allocated, shares)
         ]
 
-        # Initialize cache dictionary levels with setdefault.
-        location_cache = self.cache.setdefault(location, {})
-        model_cache = location_cache.setdefault(self.model, {})
-
         # Add the new entry to the cache.
-        model_cache[exc_key] = entry
+        self.cache[exc_key] = entry
 
     def is_exchange_in_cache(self, exchange: dict, dataset_location: str) -> bool:
         """
@@ -1442,47 +1548,29 @@ class BaseTransformation:
 
         """
         return (
+            dataset_location,
+            self.model,
             exchange["name"],
             exchange["product"],
             exchange["location"],
             exchange["unit"],
-        ) in self.cache.get(dataset_location, {}).get(self.model, {})
+        ) in self.cache
 
     def process_cached_exchange(
-        self, exchange: dict, dataset: dict, new_exchanges: list
+        self, exchange: dict, exchanges: list, new_rows: list
     ) -> None:
         """
-        Process a cached exchange. Adds the new exchanges to the list of new exchanges.
+        Process a cached exchange. Adds the new exchanges to the list of new exchange rows.
         :param exchange: The exchange dictionary to process.
-        :param dataset: The dataset dictionary.
-        :param new_exchanges: The list of new exchanges to add to the dataset.
+        :param exchanges: The cache entry of the exchange.
+        :param new_rows: The list of (name, product, location, unit, amount) rows
+        to add to the dataset.
 
         """
-        exchanges = self.cache[dataset["location"]][self.model][
-            (
-                exchange["name"],
-                exchange["product"],
-                exchange["location"],
-                exchange["unit"],
-            )
-        ]
-
         if isinstance(exchanges, tuple):
             exchanges = [exchanges]
 
-        new_exchanges.extend(
-            [
-                {
-                    "name": i[0],
-                    "product": i[1],
-                    "unit": i[3],
-                    "location": i[2],
-                    "type": "technosphere",
-                    "amount": exchange["amount"] * i[-1],
-                }
-                for i in exchanges
-            ]
-        )
+        new_rows.extend(self.create_new_exchanges(exchanges, exchange["amount"]))
 
     def process_uncached_exchange(
         self,
@@ -1770,11 +1858,16 @@ class BaseTransformation:
         biggest_first=False,
         contained=False,
     ):
-        new_exchanges = []
+        # cache hits are collected as rows, rather than exchanges
+        new_exchanges, new_rows = [], []
 
         for exchange in filter_technosphere_exchanges(dataset["exchanges"]):
-            if self.is_exchange_in_cache(exchange, dataset["location"]):
-                self.process_cached_exchange(exchange, dataset, new_exchanges)
+            # the cache is looked up once per exchange
+            cached_exchanges = self.get_exchange_from_cache(
+                exchange, dataset["location"]
+            )
+            if cached_exchanges is not None:
+                self.process_cached_exchange(exchange, cached_exchanges, new_rows)
             else:
                 self.process_uncached_exchange(
                     exchange,
@@ -1785,7 +1878,7 @@ class BaseTransformation:
                     contained,
                 )
 
-        return new_exchanges
+        return new_exchanges, new_rows
 
     def relink_technosphere_exchanges(
         self,
@@ -1812,18 +1905,22 @@ class BaseTransformation:
             * ``iam_regions``: List, lists IAM regions, if additional ones need to be defined.
         Modifies the dataset in place; returns the modified dataset."""
 
-        sum_before = sum(exc["amount"] for exc in dataset["exchanges"])
-
-        # collect the name of exchange and the sum of amounts
-        # as a dictionary, for all technosphere exchanges
-        # in the dataset
+        # collect the sum of amounts, and the name of exchange and
+        # the sum of amounts as a dictionary, for all technosphere
+        # exchanges in the dataset, in a single pass over the exchanges
 
+        sum_before, sum_other = 0, 0
         exchanges_before = defaultdict(float)
+        other_exchanges = []
         for exc in dataset["exchanges"]:
+            sum_before += exc["amount"]
             if exc["type"] == "technosphere":
                 exchanges_before[exc["product"]] += exc["amount"]
+            else:
+                sum_other += exc["amount"]
+                other_exchanges.append(exc)
 
-        new_exchanges = self.find_candidates(
+        new_exchanges, new_rows = self.find_candidates(
             dataset,
             exclusive=exclusive,
             biggest_first=biggest_first,
@@ -1834,28 +1931,11 @@ class BaseTransformation:
         # and sum the amounts of exchanges with the same name,
         # product, location and unit
 
-        new_exchanges = [
-            {
-                "name": name,
-                "product": prod,
-                "location": location,
-                "unit": unit,
-                "type": "technosphere",
-                "amount": sum(exc["amount"] for exc in exchanges),
-            }
-            for (name, prod, location, unit), exchanges in groupby(
-                sorted(
-                    new_exchanges, key=itemgetter("name", "product", "location", "unit")
-                ),
-                key=itemgetter("name", "product", "location", "unit"),
-            )
-        ]
+        new_exchanges = self.summarize_exchanges(new_exchanges, new_rows)
 
-        dataset["exchanges"] = [
-            exc for exc in dataset["exchanges"] if exc["type"] != "technosphere"
-        ] + new_exchanges
+        dataset["exchanges"] = other_exchanges + new_exchanges
 
-        sum_after = sum(exc["amount"] for exc in dataset["exchanges"])
+        sum_after = sum_other + sum(exc["amount"] for exc in new_exchanges)
 
         assert np.allclose(sum_before, sum_after, rtol=1e-3), (
             f"Sum of exchanges before and after relinking is not the same: {sum_before} != {sum_after}"
@@ -1863,13 +1943,12 @@ class BaseTransformation:
         )
 
         # compare new exchanges with exchanges before
-        exchanges_after = defaultdict(float)
-        for exc in dataset["exchanges"]:
-            if exc["type"] == "technosphere":
-                exchanges_after[exc["product"]] += exc["amount"]
+        exchanges_after = {
+            exc["product"] for exc in new_exchanges if exc["type"] == "technosphere"
+        }
 
-        assert set(exchanges_before.keys()) == set(exchanges_after.keys()), (
-            f"Exchanges before and after relinking are not the same: {set(exchanges_before.keys())} != {set(exchanges_after.keys())}"
+        assert set(exchanges_before.keys()) == exchanges_after, (
+            f"Exchanges before and after relinking are not the same: {set(exchanges_before.keys())} != {exchanges_after}"
             f"\n{dataset['name']}|{dataset['location']}"
         )
 
@@ -1883,16 +1962,27 @@ class BaseTransformation:
         exclusive,
         biggest_first,
     ):
+        # the match only depends on the arguments,
+        # and the same queries recur across datasets and exchanges
+        key = (location, tuple(possible_locations), contained, exclusive, biggest_first)
+        if key in self.gis_match_cache:
+            return self.gis_match_cache[key]
+
         # prepare locations in possible_locations
         # all locations in possible_locations that are an IAM region
         # need to be converted to tuples with (model.upper(), location)
         # and other locations longer than 2 characters (other than GLO)
         # are converted to tuples with ("ecoinvent", location).
 
+        # the model label and the IAM regions are prepared
+        # once, rather than for each possible location
+        model = self.model.upper()
+        iam_regions = set(self.regions)
+
         possible_locations = [
             (
-                (self.model.upper(), loc)
-                if loc in self.regions
+                (model, loc)
+                if loc in iam_regions
                 else (
                     ("ecoinvent", loc)
                     if (len(loc) > 2 and loc not in ["GLO", "RoW"])
@@ -1915,4 +2005,6 @@ class BaseTransformation:
                 only=possible_locations,
             )
 
+        self.gis_match_cache[key] = gis_match
+
         return gis_match
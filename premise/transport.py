@@ -16,7 +16,11 @@ from wurst import transformations as wt
 
 from .filesystem_constants import DATA_DIR, IAM_OUTPUT_DIR, INVENTORY_DIR
 from .inventory_imports import VariousVehicles
-from .transformation import BaseTransformation, IAMDataCollection
+from .transformation import (
+    BaseTransformation,
+    IAMDataCollection,
+    get_ecoinvent_to_iam_location,
+)
 from .utils import HiddenPrints, eidb_label
 
 FILEPATH_FLEET_COMP = IAM_OUTPUT_DIR / "fleet_files" / "fleet_all_vehicles.csv"
@@ -675,7 +679,9 @@ class Transport(BaseTransformation):
                             name = f"{vehicles_map['truck']['old_trucks'][self.model][key]}, long haul"
                             cycle = ", long haul"
 
-                        loc = self.geo.ecoinvent_to_iam_location(dataset["location"])
+                        loc = get_ecoinvent_to_iam_location(
+                            self.model, dataset["location"]
+                        )
                         if (name, loc) in list_created_trucks:
                             exc["name"] = name
 
@@ -689,8 +695,8 @@ class Transport(BaseTransformation):
                         )
 
                     exc["product"] = "transport, freight, lorry"
-                    exc["location"] = self.geo.ecoinvent_to_iam_location(
-                        dataset["location"]
+                    exc["location"] = get_ecoinvent_to_iam_location(
+                        self.model, dataset["location"]
                     )
 
         self.database = datasets.merge_inventory()
@@ -1,3 +1,6 @@
+import numpy as np
+import sparse
+
 from premise.clean_datasets import remove_uncertainty
 from premise.export import *
 
@@ -98,3 +101,25 @@ def test_remove_uncertainty():
         for exc in ds["exchanges"]:
             if "uncertainty_type" in exc:
                 assert exc["uncertainty_type"] == 0
+
+
+def test_get_scenario_values():
+    rng = np.random.default_rng(42)
+    dense = rng.uniform(size=(6, 5, 4)) * (rng.uniform(size=(6, 5, 4)) > 0.5)
+    # the last supplier and consumer only have a value in the last scenario,
+    # and the first supplier has no value for the last consumer
+    dense[-1, -1, :] = [0, 0, 0, 2.0]
+    dense[0, -1, :] = 0
+    m = sparse.COO.from_numpy(dense)
+
+    # (consumer, supplier) pairs, including both ends of the array
+    inds = np.array([[4, 5], [0, 0], [2, 3], [4, 0], [1, 5]])
+    values = get_scenario_values(m, inds)
+
+    # same values as indexing the array for each pair
+    np.testing.assert_array_equal(
+        values, np.array([m[s, c, :].todense() for c, s in inds])
+    )
+    np.testing.assert_array_equal(values[0], [0, 0, 0, 2.0])
+    np.testing.assert_array_equal(values[3], 0)
+    assert get_scenario_values(m, np.zeros((0, 2), dtype=int)).shape == (0, 4)
@@ -0,0 +1,147 @@
+# content of test_marginal_mixes.py
+import numpy as np
+import xarray as xr
+
+from premise.marginal_mixes import (
+    IAMValues,
+    consequential_method,
+    get_leadtime,
+    get_lifetime,
+    get_tech_params,
+    interpolate_iam_data,
+    load_yaml,
+)
+
+
+def get_market_data():
+    years = [2020, 2030, 2040, 2050, 2060, 2070, 2080]
+    techs = ["Coal PC", "Gas CC", "Nuclear"]
+    # Coal PC grows by 1 unit a year, Gas CC by 3 units
+    # and Nuclear decreases by 1 unit a year
+    values = np.array(
+        [
+            [100 + (y - 2020) for y in years],
+            [100 + 3 * (y - 2020) for y in years],
+            [100 - (y - 2020) for y in years],
+        ],
+        dtype=float,
+    )
+
+    return xr.DataArray(
+        np.stack([values, values]),
+        dims=["region", "variables", "year"],
+        coords={"region": ["EUR", "USA"], "variables": techs, "year": years},
+    )
+
+
+def test_get_lifetime():
+    lifetimes = get_lifetime(("Coal PC", "Gas CC", "Nuclear"))
+    assert lifetimes.shape == (3,)
+    assert lifetimes[0] == 40
+
+
+def test_get_leadtime():
+    leadtimes = get_leadtime(("Coal PC", "Gas CC", "Nuclear"))
+    assert leadtimes.shape == (3,)
+    assert all(leadtimes > 0)
+
+
+def test_get_tech_params():
+    techs = ("Nuclear", "Coal PC")
+    lifetimes, leadtimes = get_tech_params(techs)
+    np.testing.assert_array_equal(lifetimes, get_lifetime(techs))
+    np.testing.assert_array_equal(leadtimes, get_leadtime(techs))
+    assert lifetimes[1] == 40
+
+
+def test_yaml_is_loaded_once():
+    load_yaml.cache_clear()
+    get_lifetime.cache_clear()
+    get_lifetime(("Coal PC",))
+    get_lifetime(("Gas CC",))
+    assert load_yaml.cache_info().misses == 1
+
+
+def test_consequential_method_linear_regression():
+    args = {"measurement": 1, "capital replacement rate": False}
+    shares = consequential_method(get_market_data(), 2030, args, "test")
+
+    assert shares.dims == ("region", "variables", "year")
+    np.testing.assert_allclose(
+        shares.sel(region="EUR", year=2030).values, [0.25, 0.75, 0.0]
+    )
+    np.testing.assert_allclose(shares.sum(dim="variables").values, 1.0)
+
+
+def test_consequential_method_weighted_slope():
+    # the short slope starts at a fractional year,
+    # which is truncated to a whole year
+    args = {"measurement": 3, "weighted slope start": 0.7}
+    shares = consequential_method(get_market_data(), 2030, args, "test")
+
+    np.testing.assert_allclose(shares.sum(dim="variables").values, 1.0)
+    assert (shares.sel(variables="Gas CC") > shares.sel(variables="Coal PC")).all()
+
+
+def test_full_year_data_is_interpolated_once():
+    interpolate_iam_data.cache_clear()
+    args = {"measurement": 1, "capital replacement rate": False}
+    consequential_method(get_market_data(), 2030, args, "test")
+    consequential_method(get_market_data(), 2040, args, "test")
+    assert interpolate_iam_data.cache_info().misses == 1
+
+
+def test_interpolation_cache_does_not_keep_iam_data():
+    interpolate_iam_data.cache_clear()
+    values = np.ascontiguousarray(get_market_data().values)
+    key = IAMValues(values)
+
+    assert key == IAMValues(values.copy())
+    assert key != IAMValues(values * 2)
+
+    interpolate_iam_data(
+        key,
+        ("EUR", "USA"),
+        ("Coal PC", "Gas CC", "Nuclear"),
+        tuple(range(2020, 2090, 10)),
+    )
+    del values
+    assert key.values() is None
+
+
+def test_interpolation_cache_keys_compare_values():
+    values = np.ascontiguousarray(get_market_data().values)
+    values[0, 0, 0] = np.nan
+    key = IAMValues(values)
+    assert key == IAMValues(values.copy())
+
+    # different values sharing a digest are told apart
+    # while both are alive
+    other_values = values * 2
+    other = IAMValues(other_values)
+    other.digest = key.digest
+    assert key != other
+    assert hash(key) == hash(other)
+
+
+def test_consequential_method_near_end_of_data():
+    # the time interval of markets measured near the end
+    # of the data ends after its last year, and the market
+    # is seen as decreasing, as it is not produced after 2080
+    for measurement in range(6):
+        args = {"measurement": measurement, "capital replacement rate": False}
+        shares = consequential_method(get_market_data(), 2076, args, "test")
+
+        np.testing.assert_allclose(
+            shares.sel(region="EUR", year=2076).values, [0.0, 0.0, 1.0]
+        )
+
+
+def test_consequential_method_weighted_slope_of_zero_width():
+    # the short slope starts and ends at the end of the time interval,
+    # in which case the slope is not weighted
+    args = {"measurement": 3, "weighted slope start": 1.0}
+    shares = consequential_method(get_market_data(), 2030, args, "test")
+    slopes = consequential_method(get_market_data(), 2030, {"measurement": 0}, "test")
+
+    np.testing.assert_allclose(shares.values, slopes.values)
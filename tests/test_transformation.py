@@ -0,0 +1,303 @@
+# content of test_transformation.py
+import copy
+from collections import defaultdict
+from itertools import product
+
+import numpy as np
+import pytest
+import xarray as xr
+from wurst import searching as ws
+
+from premise.transformation import (
+    BaseTransformation,
+    copy_dataset,
+    equals_any,
+    get_geomap,
+)
+
+
+def get_transformation(datasets=()):
+    # the index methods only need the index, so the transformation
+    # is created without IAM data
+    transformation = BaseTransformation.__new__(BaseTransformation)
+    transformation.index = defaultdict(list)
+    transformation.index_ids = {}
+    transformation.add_to_index(list(datasets))
+    return transformation
+
+
+def get_dataset(name, location, product="electricity"):
+    return {
+        "name": name,
+        "reference product": product,
+        "location": location,
+        "unit": "kilowatt hour",
+        "exchanges": [],
+    }
+
+
+def test_datasets_are_indexed_once():
+    ds = get_dataset("electricity production", "FR")
+    transformation = get_transformation([ds])
+    transformation.add_to_index(ds)
+
+    assert transformation.index[("electricity production", "electricity")] == [ds]
+    assert (
+        transformation.get_from_index("electricity production", "electricity", "FR")
+        is ds
+    )
+
+
+def test_removed_datasets_can_be_indexed_again():
+    datasets = [get_dataset("electricity production", loc) for loc in ("FR", "DE")]
+    transformation = get_transformation(datasets)
+    key = ("electricity production", "electricity")
+    transformation.remove_from_index(datasets[0])
+    transformation.add_to_index(datasets)
+
+    assert transformation.index[key] == [datasets[1], datasets[0]]
+
+
+def test_renamed_datasets_are_not_found_under_their_old_name():
+    ds = get_dataset("electricity production", "FR")
+    transformation = get_transformation([ds])
+    ds["name"] = "electricity production, proxy"
+    transformation.add_to_index(ds)
+
+    assert (
+        transformation.get_from_index(
+            "electricity production, proxy", "electricity", "FR"
+        )
+        is ds
+    )
+    with pytest.raises(ws.NoResults):
+        transformation.get_from_index("electricity production", "electricity", "FR")
+
+
+def test_efficiency_changes_match_single_region_lookups():
+    transformation = get_transformation()
+    transformation.year = 2030
+    data = xr.DataArray(
+        [[[1.0, 1.3]], [[1.0, 0.7]], [[1.0, np.inf]]],
+        dims=["region", "variables", "year"],
+        coords={
+            "region": ["EUR", "USA", "CHA"],
+            "variables": ["PV"],
+            "year": [2020, 2050],
+        },
+    )
+
+    changes = transformation.find_iam_efficiency_changes(
+        data, "PV", ["CHA", "EUR", "USA"]
+    )
+
+    # as with the baseline interpolation of a single region,
+    # infinite efficiency changes are replaced by 1
+    np.testing.assert_allclose(changes, [1.0, 1.1, 0.9])
+    for region, change in zip(["CHA", "EUR", "USA"], changes):
+        assert transformation.find_iam_efficiency_change(data, "PV", region) == change
+    assert transformation.find_iam_efficiency_changes(data, "PV", []).size == 0
+
+
+def get_exchange(name, location, amount, unit="kilowatt hour"):
+    return {
+        "name": name,
+        "product": "electricity",
+        "location": location,
+        "unit": unit,
+        "type": "technosphere",
+        "amount": amount,
+    }
+
+
+def test_summarize_exchanges_sums_duplicates_in_sorted_order():
+    transformation = get_transformation()
+    exchanges = [
+        get_exchange("market for electricity", "FR", 0.5),
+        get_exchange("electricity production", "DE", 0.25),
+        get_exchange("market for electricity", "FR", 0.25),
+        get_exchange("market for electricity", "FR", 2.0, unit="megajoule"),
+    ]
+    rows = [("electricity production", "electricity", "DE", "kilowatt hour", 0.5)]
+
+    summary = transformation.summarize_exchanges(exchanges, rows)
+
+    # as with the former sort and groupby, exchanges are sorted
+    # by name, product, location and unit, and their amounts summed
+    assert summary == [
+        get_exchange("electricity production", "DE", 0.75),
+        get_exchange("market for electricity", "FR", 0.75),
+        get_exchange("market for electricity", "FR", 2.0, unit="megajoule"),
+    ]
+    assert transformation.summarize_exchanges(exchanges[2:] + exchanges[:2]) == (
+        transformation.summarize_exchanges(exchanges)
+    )
+
+
+def test_flat_cache_keeps_entries_per_location_and_model():
+    transformation = get_transformation()
+    transformation.model = "remind"
+    transformation.cache = {}
+    exchange = get_exchange("market for electricity", "FR", 1.0)
+    supplier = get_dataset("market for electricity", "EUR")
+    transformation.add_new_entry_to_cache("FR", exchange, [supplier], [1.0])
+
+    assert transformation.is_exchange_in_cache(exchange, "FR")
+    assert not transformation.is_exchange_in_cache(exchange, "DE")
+    assert not transformation.is_exchange_in_cache(
+        get_exchange("market for electricity", "FR", 1.0, unit="megajoule"), "FR"
+    )
+
+    # the cache is shared between transformations of different models
+    other = get_transformation()
+    other.model = "image"
+    other.cache = transformation.cache
+    assert not other.is_exchange_in_cache(exchange, "FR")
+
+    # exchanges differing by their amount only share the cache entry,
+    # and are relinked with their own amount
+    rows = []
+    for amount in (1.0, 0.5):
+        entries = transformation.get_exchange_from_cache(
+            get_exchange("market for electricity", "FR", amount), "FR"
+        )
+        transformation.process_cached_exchange(
+            get_exchange("market for electricity", "FR", amount), entries, rows
+        )
+
+    assert rows == [
+        ("market for electricity", "electricity", "EUR", "kilowatt hour", 1.0),
+        ("market for electricity", "electricity", "EUR", "kilowatt hour", 0.5),
+    ]
+
+
+def get_gis_transformation():
+    transformation = get_transformation()
+    transformation.model = "image"
+    transformation.geo = get_geomap("image")
+    transformation.regions = transformation.geo.iam_regions
+    transformation.gis_match_cache = {}
+    return transformation
+
+
+def test_gis_matches_are_cached_per_query():
+    transformation = get_gis_transformation()
+    possible_locations = ["WEU", "RER", "FR", "GLO"]
+
+    for contained, exclusive, biggest_first in product([True, False], repeat=3):
+        args = ("FR", possible_locations, contained, exclusive, biggest_first)
+        match = transformation.get_gis_match(*args)
+
+        # same result as with an empty cache
+        assert match == get_gis_transformation().get_gis_match(*args)
+        assert transformation.get_gis_match(*args) is match
+
+    # the cache is keyed on every argument
+    assert len(transformation.gis_match_cache) == 8
+    assert transformation.get_gis_match(
+        "FR", ["WEU", "GLO"], True, False, False
+    ) != transformation.get_gis_match("FR", possible_locations, True, False, False)
+
+
+def test_remove_many_from_index_removes_one_entry_per_dataset():
+    datasets = [
+        get_dataset("market for electricity", "FR"),
+        get_dataset("market for electricity", "DE"),
+        get_dataset("market for electricity", "FR"),
+        get_dataset("market for heat", "FR", product="heat"),
+    ]
+    key = ("market for electricity", "electricity")
+
+    transformation = get_transformation(datasets)
+    transformation.remove_many_from_index(
+        [get_dataset("market for electricity", "FR")] * 3
+        + [get_dataset("market for electricity", "CH")]
+    )
+    # as with repeated calls to the former remove_from_index,
+    # each dataset removes at most one entry of its location
+    assert transformation.index[key] == [datasets[1]]
+
+    transformation = get_transformation(datasets)
+    transformation.remove_many_from_index(
+        iter([datasets[0], get_dataset("market for heat", "FR", product="heat")])
+    )
+    assert transformation.index[key] == datasets[1:3]
+    assert transformation.index[("market for heat", "heat")] == []
+
+    transformation = get_transformation(datasets)
+    for ds in datasets[:2]:
+        transformation.remove_from_index(ds)
+    assert transformation.index[key] == [datasets[2]]
+
+
+def test_copy_dataset_matches_deepcopy():
+    ds = get_dataset("electricity production", "FR")
+    ds["parameters"] = {"efficiency": 0.4}
+    ds["classifications"] = [("ISIC rev.4 ecoinvent", "3510")]
+    ds["exchanges"] = [
+        {**get_exchange("electricity production", "FR", 1.0), "type": "production"},
+        {**get_exchange("hard coal", "FR", 0.3, unit="kilogram"), "tags": ["fuel"]},
+    ]
+    original = copy.deepcopy(ds)
+
+    new_ds = copy_dataset(ds)
+    assert new_ds == original
+
+    # modifying the copy, as fetch_proxies() does, leaves the original unchanged
+    new_ds["location"] = "EUR"
+    new_ds["parameters"]["efficiency"] = 0.5
+    new_ds["classifications"].append(("CPC", "17100"))
+    new_ds["exchanges"][0]["location"] = "EUR"
+    new_ds["exchanges"][1]["amount"] = 0.2
+    new_ds["exchanges"][1]["tags"].append("coal")
+    new_ds["exchanges"].append(get_exchange("heat", "FR", 1.0))
+
+    assert ds == original
+
+
+def test_relink_datasets_sums_the_amounts_of_duplicate_exchanges():
+    supplier = get_dataset("market for electricity", "FR")
+    heat = get_dataset("market for heat", "FR", product="heat")
+    act = get_dataset("steel production", "FR", product="steel")
+    act["exchanges"] = [
+        {**get_exchange("steel production", "FR", 1.0), "type": "production"},
+        get_exchange("market for electricity", "RER", 0.25),
+        get_exchange("market for heat", "FR", 2.0),
+        get_exchange("market for electricity", "RER", 0.5),
+        get_exchange("market for electricity", "RER", 0),
+    ]
+    act["exchanges"][2]["product"] = "heat"
+
+    transformation = get_transformation([supplier, heat, act])
+    transformation.database = [supplier, heat, act]
+    transformation.model = "image"
+    transformation.cache = {}
+    transformation.ecoinvent_to_iam_loc = {"FR": "WEU"}
+    exchanges = act["exchanges"]
+
+    transformation.relink_datasets()
+
+    # exchanges to relink are replaced by one exchange to the new supplier,
+    # with the summed amount, and the other exchanges are kept in place
+    assert act["exchanges"][:3] == [exchanges[0], exchanges[2], exchanges[4]]
+    assert act["exchanges"][3:] == [get_exchange("market for electricity", "FR", 0.75)]
+
+
+def test_equals_any_matches_either_of_equals():
+    datasets = [
+        get_dataset("market for electricity", "FR"),
+        get_dataset("market for electricity", "DE"),
+        get_dataset("market for electricity", "RER"),
+        {"name": "dataset without location"},
+    ]
+    locations = ["FR", "RER", "CH"]
+
+    expected = list(
+        ws.get_many(datasets, ws.either(*[ws.equals("location", l) for l in locations]))
+    )
+    assert list(ws.get_many(datasets, equals_any("location", locations))) == expected
+    # the values can be given as any iterable, including a generator
+    assert (
+        list(ws.get_many(datasets, equals_any("location", iter(locations)))) == expected
+    )
+    assert not list(ws.get_many(datasets, equals_any("location", [])))